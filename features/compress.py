@@ -6,6 +6,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import Qt
 
+from features.display_list_cache import shared_display_list_cache
+from features.fitz_lock import FITZ_LOCK
+
 
 class PDFCompressorUI(QWidget):
     def __init__(self):
@@ -48,7 +51,8 @@ class PDFCompressorUI(QWidget):
             return
 
         try:
-            self.doc = fitz.open(file)
+            with FITZ_LOCK:
+                self.doc = fitz.open(file)
             self.file_path = file
             self.status_label.setText(f"Loaded: {file} ({len(self.doc)} pages)")
             self.compress_btn.setEnabled(True)
@@ -59,8 +63,9 @@ class PDFCompressorUI(QWidget):
     def load_thumbnails(self):
         self.thumbnail_list.clear()
         for page_num in range(len(self.doc)):
-            page = self.doc.load_page(page_num)
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
+            with FITZ_LOCK:
+                page = self.doc.load_page(page_num)
+                pix = shared_display_list_cache().render(page, fitz.Matrix(0.2, 0.2), alpha=True)
             image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGBA8888)
             item = QListWidgetItem(f"Page {page_num + 1}")
             item.setIcon(QPixmap.fromImage(image))
@@ -72,11 +77,13 @@ class PDFCompressorUI(QWidget):
 
         try:
             for page in self.doc:
-                page.clean_contents()
+                with FITZ_LOCK:
+                    page.clean_contents()
 
             out_path, _ = QFileDialog.getSaveFileName(self, "Save Compressed PDF", "compressed.pdf", "PDF Files (*.pdf)")
             if out_path:
-                self.doc.save(out_path, deflate=True)
+                with FITZ_LOCK:
+                    self.doc.save(out_path, deflate=True)
                 QMessageBox.information(self, "Success", f"Compressed PDF saved to:\n{out_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Compression failed:\n{str(e)}")
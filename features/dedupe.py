@@ -0,0 +1,150 @@
+import hashlib
+import re
+
+from features.fitz_lock import FITZ_LOCK
+
+REFERENCE = re.compile(r"\b(\d+) 0 R\b")
+# Objects whose identity matters, so two equal copies must stay two objects
+DISTINCT_TYPES = ("/Page", "/Pages", "/Catalog", "/Outlines", "/Annot", "/OCG", "/OCMD",
+                  "/StructTreeRoot", "/StructElem", "/Sig", "/XRef", "/ObjStm")
+# Keys of objects that sit in a tree or on a page rather than being plain resources
+DISTINCT_KEYS = ("Parent", "Kids", "P", "Rect", "Prev", "Next", "First")
+# Deeper reference chains are hashed by xref number, i.e. never matched
+MAX_DEPTH = 64
+# Objects examined between should_stop() checks and progress reports
+CHECK_EVERY = 256
+
+
+def _shareable(doc, xref):
+    """Whether an object may be replaced by an identical copy: fonts, images, colour spaces, ExtGStates..."""
+    if doc.xref_get_key(xref, "Type")[1] in DISTINCT_TYPES:
+        return False
+    if doc.xref_is_stream(xref):
+        return True
+    keys = doc.xref_get_keys(xref)
+    if keys:
+        return not any(key in DISTINCT_KEYS for key in keys)
+    # Bare arrays, e.g. an Indexed colour space or a font's DescendantFonts
+    return doc.xref_object(xref, compressed=True).startswith("[")
+
+
+def _remembered(doc, xref):
+    """Whether later batches match against an object: streams, which hold the bytes, and fonts."""
+    return doc.xref_is_stream(xref) or doc.xref_get_key(xref, "Type")[1] in ("/Font", "/FontDescriptor")
+
+
+def _rewrite_references(doc, xrefs, replacements):
+    def replace(match):
+        target = replacements.get(int(match.group(1)))
+        return f"{target} 0 R" if target is not None else match.group(0)
+
+    for xref in xrefs:
+        if xref in replacements:
+            continue
+        keys = doc.xref_get_keys(xref)
+        if keys:
+            for key in keys:
+                value_type, value = doc.xref_get_key(xref, key)
+                if value_type in ("xref", "array", "dict"):
+                    new_value = REFERENCE.sub(replace, value)
+                    if new_value != value:
+                        doc.xref_set_key(xref, key, new_value)
+        elif not doc.xref_is_stream(xref):
+            # Bare arrays, e.g. a font's DescendantFonts held as its own object
+            text = doc.xref_object(xref, compressed=True)
+            new_text = REFERENCE.sub(replace, text)
+            if new_text != text:
+                doc.update_object(xref, new_text)
+
+
+class ResourceDeduper:
+    """Shares identical fonts, images, form XObjects and what they use among objects added to a document in batches.
+
+    Call share() after each batch of pages is copied in and before it is
+    saved. An object is matched by a hash of its definition and raw stream
+    in which each reference to another shareable object is replaced by that
+    object's own hash, so an image with its ICC profile, a font with its
+    ToUnicode map or a form with its ExtGState matches another copy although
+    the copies' objects are numbered differently. Objects are matched
+    against each other and against earlier batches, and references to a
+    duplicate are pointed at the first copy. Only the new batch is visited,
+    each raw stream is hashed once, and of earlier batches only the hashes
+    of streams and fonts are remembered, so the work and memory follow the
+    batch size. Duplicate streams are emptied, so even an incremental save
+    stores next to nothing for them; a garbage-collecting save drops them
+    entirely.
+    """
+
+    def __init__(self):
+        # fingerprint -> xref of the copy every later duplicate points at
+        self.canonical = {}
+        self.objects = 0
+        self.bytes_saved = 0
+
+    def share(self, doc, first_xref, should_stop=None, progress=None):
+        """Deduplicate objects numbered first_xref and up; returns False if stopped early.
+
+        progress(done, total) is called as objects are examined. A stopped
+        batch is left as it was, with its duplicates merely still stored.
+        """
+        xrefs = range(first_xref, doc.xref_length())
+        with FITZ_LOCK:
+            candidates = [xref for xref in xrefs if _shareable(doc, xref)]
+        shareable = set(candidates)
+        fingerprints = {}
+        streams = {}
+        for done, xref in enumerate(candidates):
+            if done % CHECK_EVERY == 0:
+                if should_stop and should_stop():
+                    return False
+                if progress:
+                    progress(done, len(candidates))
+            with FITZ_LOCK:
+                self._fingerprint(doc, xref, shareable, fingerprints, streams, set())
+
+        local = {}
+        duplicates = {}
+        for xref in candidates:
+            key = fingerprints[xref]
+            target = self.canonical.get(key) or local.setdefault(key, xref)
+            if target != xref:
+                duplicates[xref] = target
+
+        with FITZ_LOCK:
+            if duplicates:
+                _rewrite_references(doc, xrefs, duplicates)
+            # Later batches match against this one
+            for key, xref in local.items():
+                if _remembered(doc, xref):
+                    self.canonical.setdefault(key, xref)
+            for xref in duplicates:
+                if xref in streams:
+                    self.bytes_saved += streams[xref][1]
+                    doc.update_stream(xref, b"")
+        self.objects += len(duplicates)
+        if progress:
+            progress(len(candidates), len(candidates))
+        return True
+
+    def _fingerprint(self, doc, xref, shareable, fingerprints, streams, visiting):
+        if xref in fingerprints:
+            return fingerprints[xref]
+
+        def reference(match):
+            target = int(match.group(1))
+            # Objects that must stay distinct, objects of earlier batches and
+            # reference cycles are hashed by number, so they only match themselves
+            if target not in shareable or target in visiting or len(visiting) >= MAX_DEPTH:
+                return match.group(0)
+            return "@" + self._fingerprint(doc, target, shareable, fingerprints, streams, visiting).hex()
+
+        visiting.add(xref)
+        text = REFERENCE.sub(reference, doc.xref_object(xref, compressed=True))
+        visiting.discard(xref)
+        digest = hashlib.sha256(text.encode())
+        if doc.xref_is_stream(xref):
+            raw = doc.xref_stream_raw(xref) or b""
+            streams[xref] = (hashlib.sha256(raw).digest(), len(raw))
+            digest.update(streams[xref][0])
+        fingerprints[xref] = digest.digest()
+        return fingerprints[xref]
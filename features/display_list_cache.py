@@ -0,0 +1,110 @@
+import os
+import threading
+from collections import OrderedDict
+
+from features.fitz_lock import FITZ_LOCK
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_MB = 128
+# Rough ratio between a decoded content stream and the display list built from it
+DISPLAY_LIST_OVERHEAD = 4
+
+_shared_cache = None
+
+
+def page_key(page):
+    path = page.parent.name
+    try:
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns, page.number)
+    except OSError:
+        # In-memory documents have no file to stat; key them by object identity
+        return (id(page.parent), page.number)
+
+
+class _Slice:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.used_bytes = 0
+
+
+class DisplayListCache:
+    """Parsed page content kept as MuPDF display lists.
+
+    Rendering a cached page again, at any scale or clip, skips re-interpreting
+    its content stream. A display list belongs to the document it was built
+    from, and PyMuPDF objects must never be shared between threads, so each
+    thread has its own slice of the cache, keyed by thread id like the
+    document pool; limits (entry count and an approximate size) apply per
+    slice. Slices are only touched under FITZ_LOCK.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_mb=DEFAULT_MAX_MB, enabled=True):
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        # thread id -> _Slice
+        self._slices = {}
+
+    def _slice(self, thread=None):
+        return self._slices.setdefault(threading.get_ident() if thread is None else thread, _Slice())
+
+    @property
+    def used_bytes(self):
+        """Approximate size of this thread's slice."""
+        with FITZ_LOCK:
+            return self._slice().used_bytes
+
+    def render(self, page, matrix, clip=None, alpha=False):
+        with FITZ_LOCK:
+            if not self.enabled:
+                return page.get_pixmap(matrix=matrix, clip=clip, alpha=alpha)
+            return self.display_list(page).get_pixmap(matrix=matrix, clip=clip, alpha=alpha)
+
+    def display_list(self, page):
+        key = page_key(page)
+        with FITZ_LOCK:
+            cache_slice = self._slice()
+            entries = cache_slice.entries
+            entry = entries.get(key)
+            if entry is not None and entry[2] is not page.parent:
+                # Built from another copy of the file, which may have been closed since
+                cache_slice.used_bytes -= entries.pop(key)[1]
+                entry = None
+            if entry is not None:
+                self.hits += 1
+                entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+            display_list = page.get_displaylist()
+            size = len(page.read_contents()) * DISPLAY_LIST_OVERHEAD
+            entries[key] = (display_list, size, page.parent)
+            cache_slice.used_bytes += size
+            while entries and (len(entries) > self.max_entries or cache_slice.used_bytes > self.max_bytes):
+                _, (_, evicted_size, _) = entries.popitem(last=False)
+                cache_slice.used_bytes -= evicted_size
+            return display_list
+
+    def evict_path(self, path, thread=None):
+        """Drop a thread's display lists of a file, e.g. when its document closes; the calling thread's by default."""
+        path = os.path.abspath(path)
+        with FITZ_LOCK:
+            cache_slice = self._slice(thread)
+            for key in [k for k in cache_slice.entries if k[0] == path]:
+                cache_slice.used_bytes -= cache_slice.entries.pop(key)[1]
+            if not cache_slice.entries:
+                self._slices.pop(threading.get_ident() if thread is None else thread, None)
+
+    def clear(self):
+        """Empty this thread's slice."""
+        with FITZ_LOCK:
+            self._slices.pop(threading.get_ident(), None)
+
+
+def shared_display_list_cache():
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = DisplayListCache()
+    return _shared_cache
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import fitz
+
+from features.display_list_cache import shared_display_list_cache
+from features.fitz_lock import FITZ_LOCK
+
+DEFAULT_MAX_OPEN = 8
+DEFAULT_IDLE_SECONDS = 60
+
+_shared_pool = None
+
+
+def document_key(path):
+    """Pool key of a file: rewriting the file gives it a new key."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+class _PooledDocument:
+    def __init__(self, key, doc):
+        self.key = key
+        self.doc = doc
+        self.refs = 0
+        self.last_used = time.monotonic()
+
+
+class DocumentHandle:
+    """A reference to a pooled document; release it (or leave the with block) when done.
+
+    The document stays open in the pool after release, so the next open of the
+    same file is free. Never close the document through the handle.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def doc(self):
+        if self._entry is None:
+            raise ValueError("document handle already released")
+        return self._entry.doc
+
+    def release(self):
+        if self._entry is not None:
+            self._pool._release(self._entry)
+            self._entry = None
+
+    def __enter__(self):
+        return self.doc
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class DocumentPool:
+    """Process-wide pool of read-only documents, reference counted and keyed by path and mtime.
+
+    PyMuPDF documents must never be shared between threads, so every thread
+    gets its own slice of the pool, keyed by thread id; limits apply per
+    slice. (threading.local is no use here: a QThreadPool worker gets a fresh
+    Python thread state for every task it runs.) Documents nobody holds are
+    closed once idle for `idle_seconds`, or least recently used first when
+    more than `max_open` are open. Idle documents are reaped on the next
+    acquire or release in their thread, by sweep() for the calling thread,
+    or by sweep_all() for every thread, so slices of threads that have gone
+    quiet do not keep their files open. Bookkeeping runs under FITZ_LOCK,
+    which is what lets one thread close another's idle documents.
+    Documents that are edited and saved must be opened with fitz.open instead.
+    """
+
+    def __init__(self, max_open=DEFAULT_MAX_OPEN, idle_seconds=DEFAULT_IDLE_SECONDS):
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self.hits = 0
+        self.misses = 0
+        # thread id -> that thread's OrderedDict of key -> _PooledDocument
+        self._slices = {}
+
+    def _entries(self):
+        return self._slices.setdefault(threading.get_ident(), OrderedDict())
+
+    def acquire(self, path):
+        key = document_key(path)
+        with FITZ_LOCK:
+            entries = self._entries()
+            entry = entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                entry = _PooledDocument(key, fitz.open(path))
+            else:
+                self.hits += 1
+            entries[key] = entry  # re-insert as most recently used
+            entry.refs += 1
+            self._trim(entries)
+        return DocumentHandle(self, entry)
+
+    def open(self, path):
+        """Alias of acquire() for use as `with pool.open(path) as doc:`."""
+        return self.acquire(path)
+
+    def _release(self, entry):
+        with FITZ_LOCK:
+            entry.refs -= 1
+            entry.last_used = time.monotonic()
+            entries = self._entries()
+            if entries.get(entry.key) is not entry:
+                # Dropped from the pool while in use (file rewritten, close_all, sweep_all)
+                if entry.refs <= 0:
+                    entry.doc.close()
+                return
+            self._trim(entries)
+
+    def sweep(self):
+        """Close this thread's documents that have been idle too long."""
+        with FITZ_LOCK:
+            self._trim(self._entries())
+
+    def sweep_all(self):
+        """Close idle documents in every thread's slice, e.g. from a timer on the GUI thread."""
+        with FITZ_LOCK:
+            for thread, entries in list(self._slices.items()):
+                self._trim(entries, thread)
+                if not entries:
+                    del self._slices[thread]
+
+    def evict_path(self, path):
+        """Forget every version of a file, closing the ones not in use."""
+        path = os.path.abspath(path)
+        with FITZ_LOCK:
+            entries = self._entries()
+            for key in [k for k in entries if k[0] == path]:
+                self._close(entries, key)
+
+    def close_all(self):
+        with FITZ_LOCK:
+            entries = self._entries()
+            for key in list(entries):
+                self._close(entries, key)
+
+    def open_count(self):
+        with FITZ_LOCK:
+            return len(self._entries())
+
+    def _trim(self, entries, thread=None):
+        now = time.monotonic()
+        latest = {}
+        for key in entries:
+            latest[key[0]] = key
+        for key, entry in list(entries.items()):
+            if entry.refs > 0:
+                continue
+            stale = latest[key[0]] != key
+            if stale or now - entry.last_used > self.idle_seconds or len(entries) > self.max_open:
+                self._close(entries, key, thread)
+
+    def _close(self, entries, key, thread=None):
+        entry = entries.pop(key)
+        if entry.refs > 0:
+            # Still held: closed by the last release instead
+            return
+        shared_display_list_cache().evict_path(key[0], thread)
+        entry.doc.close()
+
+
+def document_pool():
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = DocumentPool()
+    return _shared_pool
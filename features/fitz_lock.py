@@ -0,0 +1,10 @@
+import threading
+
+# PyMuPDF does not support multithreading: MuPDF keeps global state, and two
+# threads inside fitz at once can block each other or crash. Every call into
+# fitz made while another thread might also be in it -- the render thread,
+# the search, merge and conversion workers, and the GUI-thread code that runs
+# beside them -- holds this lock. It is re-entrant, so helpers that take it
+# can be called from code already holding it. Hold it for one unit of work
+# (a page, a file, a save), not for a whole job, so the others keep moving.
+FITZ_LOCK = threading.RLock()
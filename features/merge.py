@@ -1,14 +1,141 @@
-from PyPDF2 import PdfMerger
+import os
+import tempfile
+
+import fitz
 from PyQt5.QtWidgets import QFileDialog
 
+from features.dedupe import ResourceDeduper
+from features.fitz_lock import FITZ_LOCK
+
+# Pages copied into the output before it is flushed to disk and reopened
+DEFAULT_CHUNK_PAGES = 500
+
+
+class MergeCancelled(Exception):
+    pass
+
+
+def merge_pdfs(paths, out_path, progress=None, should_stop=None, append=False, chunk_pages=DEFAULT_CHUNK_PAGES,
+               dedupe=True, dedupe_progress=None):
+    """Merge `paths`, in order, into `out_path`, streaming through the output file.
+
+    Each source is opened, copied whole (so links between its own pages
+    survive) and closed before the next one; every `chunk_pages` pages the
+    output is saved incrementally and reopened, so memory stays flat however
+    many files are merged. The sources' outlines are combined, shifted to
+    where each file lands. progress(file_index, file_count, page_count,
+    page_count) is called after every file, and should_stop() is checked
+    between files; when it is true MergeCancelled is raised.
+
+    A new output is built in a temporary file next to out_path and moved
+    into place only once complete. With `append`, pages are added to the end
+    of an existing out_path in place; if the merge is cancelled or fails the
+    file is truncated back to its original contents.
+
+    With `dedupe`, fonts, images and form XObjects that several sources
+    embed identically are stored once: each chunk is deduplicated against
+    itself and earlier chunks just before it is saved, reporting
+    dedupe_progress(done, total). Pages already in an appended-to output are
+    not examined. Returns the stream bytes that sharing saved.
+    """
+    if append and os.path.exists(out_path):
+        target = out_path
+        original_size = os.path.getsize(out_path)
+    else:
+        fd, target = tempfile.mkstemp(suffix=".pdf.part", dir=os.path.dirname(os.path.abspath(out_path)))
+        os.close(fd)
+        original_size = None
+
+    out = None
+    try:
+        with FITZ_LOCK:
+            if original_size is None:
+                out = fitz.open()
+            else:
+                out = fitz.open(target)
+                if not out.can_save_incrementally():
+                    raise ValueError(f"{os.path.basename(target)} cannot be appended to in place")
+            chunk_start = out.xref_length() if original_size is not None else 1
+            toc = out.get_toc() if original_size is not None else []
+        # The first save of a new output writes the whole file, later ones append to it
+        incremental = original_size is not None
+        deduper = ResourceDeduper() if dedupe else None
+        pending = 0
+        for file_index, path in enumerate(paths):
+            if should_stop and should_stop():
+                raise MergeCancelled()
+            with FITZ_LOCK:
+                src = fitz.open(path)
+                try:
+                    page_count = len(src)
+                    offset = len(out)
+                    # One call per file: insert_pdf only keeps links whose target is in the copied range
+                    out.insert_pdf(src)
+                    toc.extend(_shift_toc(src.get_toc(), offset))
+                finally:
+                    src.close()
+            if progress:
+                progress(file_index, len(paths), page_count, page_count)
+            pending += page_count
+            if pending >= chunk_pages:
+                # Write what has been merged so far and reopen, freeing the copied objects
+                _share(deduper, out, chunk_start, should_stop, dedupe_progress)
+                with FITZ_LOCK:
+                    _save(out, target, incremental)
+                    chunk_start = out.xref_length()
+                    out.close()
+                    out = None
+                    out = fitz.open(target)
+                incremental = True
+                pending = 0
+
+        if should_stop and should_stop():
+            raise MergeCancelled()
+        _share(deduper, out, chunk_start, should_stop, dedupe_progress)
+        with FITZ_LOCK:
+            if toc:
+                out.set_toc(toc)
+            _save(out, target, incremental)
+            out.close()
+            out = None
+        if target != out_path:
+            os.replace(target, out_path)
+    except BaseException:
+        if out is not None:
+            with FITZ_LOCK:
+                out.close()
+        if original_size is not None:
+            # Incremental saves only append, so cutting the file restores it
+            with open(target, "r+b") as f:
+                f.truncate(original_size)
+        elif os.path.exists(target):
+            os.remove(target)
+        raise
+    return deduper.bytes_saved if deduper else 0
+
+
+def _shift_toc(toc, offset):
+    """Outline entries of a source moved to where its first page lands in the output."""
+    # Entries without a destination (page -1) point at the file's first page instead
+    return [[level, title, max(page, 1) + offset] for level, title, page, *_ in toc]
+
+
+def _share(deduper, out, first_xref, should_stop, progress):
+    if deduper is not None and not deduper.share(out, first_xref, should_stop, progress):
+        raise MergeCancelled()
+
+
+def _save(out, target, incremental):
+    if incremental:
+        out.save(target, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+    else:
+        out.save(target, garbage=1, deflate=True)
+
+
 def run():
     files, _ = QFileDialog.getOpenFileNames(None, "Select PDFs to Merge", "", "PDF Files (*.pdf)")
     if not files:
         return
-    merger = PdfMerger()
-    for f in files:
-        merger.append(f)
     out_path, _ = QFileDialog.getSaveFileName(None, "Save Merged PDF", "merged.pdf", "PDF Files (*.pdf)")
     if out_path:
-        merger.write(out_path)
-        merger.close()
+        merge_pdfs(files, out_path)
@@ -1,18 +1,20 @@
-import fitz  # PyMuPDF
 import os
 from PIL import Image
 
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
+
 def render_pdf(pdf_path):
-    doc = fitz.open(pdf_path)
     image_paths = []
     output_dir = "rendered_pages"
     os.makedirs(output_dir, exist_ok=True)
 
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        pix = page.get_pixmap()
-        output = os.path.join(output_dir, f"page_{page_num + 1}.png")
-        pix.save(output)
-        image_paths.append(output)
+    with document_pool().open(pdf_path) as doc:
+        for page_num in range(len(doc)):
+            with FITZ_LOCK:
+                pix = doc.load_page(page_num).get_pixmap()
+            output = os.path.join(output_dir, f"page_{page_num + 1}.png")
+            pix.save(output)
+            image_paths.append(output)
 
     return image_paths
\ No newline at end of file
@@ -0,0 +1,129 @@
+import json
+import re
+import threading
+import zlib
+
+import fitz
+
+from features.fitz_lock import FITZ_LOCK
+from features.thumbnail_cache import file_identity, shared_thumbnail_cache
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_CACHED_QUERIES = 32
+# The extraction flags page.search_for uses by default. Indexing the same text
+# (words hyphenated across lines joined up) means the index never rules out a
+# page search_for would match
+EXTRACT_FLAGS = (fitz.TEXT_DEHYPHENATE | fitz.TEXT_PRESERVE_WHITESPACE
+                 | fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP)
+# Bump when the indexed text changes, so indexes saved by older builds are rebuilt
+INDEX_VERSION = 2
+# Disk cache variant the index is stored under, so it shares the thumbnails' size cap
+INDEX_VARIANT = "search"
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index of page text: token -> sorted list of pages containing it.
+
+    It can be queried while it is still being built: pages not indexed yet are
+    always returned as candidates so a search scans them directly. Results of
+    recent queries, with hit rectangles, are kept for instant repeats.
+    """
+
+    def __init__(self, path, page_count):
+        self.path = path
+        self.identity = file_identity(path)
+        self.page_count = page_count
+        self.indexed_pages = 0
+        self.postings = {}
+        self.results = {}
+        self._lock = threading.Lock()
+
+    @property
+    def complete(self):
+        return self.indexed_pages >= self.page_count
+
+    def add_page(self, page_num, text):
+        with self._lock:
+            for token in set(tokenize(text)):
+                self.postings.setdefault(token, []).append(page_num)
+            self.indexed_pages = page_num + 1
+
+    def build(self, doc, should_stop=None, progress=None):
+        """Extract and index pages in order, resuming where a previous build stopped."""
+        for page_num in range(self.indexed_pages, self.page_count):
+            if should_stop and should_stop():
+                return False
+            with FITZ_LOCK:
+                text = doc.load_page(page_num).get_text("text", flags=EXTRACT_FLAGS)
+            self.add_page(page_num, text)
+            if progress:
+                progress(page_num + 1)
+        return True
+
+    def candidate_pages(self, query):
+        """Pages worth scanning for the query, in page order.
+
+        Indexed pages must contain every word of the query (as substrings, like
+        search_for); pages the build has not reached yet are always included.
+        """
+        tokens = tokenize(query)
+        with self._lock:
+            indexed = self.indexed_pages
+            pages = set(range(indexed)) if not tokens else None
+            for token in tokens:
+                matches = set()
+                for word, word_pages in self.postings.items():
+                    if token in word:
+                        matches.update(word_pages)
+                pages = matches if pages is None else pages & matches
+                if not pages:
+                    break
+        return sorted(pages) + list(range(indexed, self.page_count))
+
+    def cached_results(self, query):
+        return self.results.get(query.lower())
+
+    def store_results(self, query, hits):
+        if not self.complete:
+            return
+        self.results[query.lower()] = hits
+        while len(self.results) > MAX_CACHED_QUERIES:
+            self.results.pop(next(iter(self.results)))
+
+    # ----- Persistence in the thumbnail cache -----
+    def save(self):
+        if not self.complete:
+            return
+        payload = json.dumps({
+            "version": INDEX_VERSION,
+            "identity": self.identity,
+            "page_count": self.page_count,
+            "postings": self.postings,
+        }).encode("utf-8")
+        shared_thumbnail_cache().put(self.path, 0, INDEX_VARIANT, zlib.compress(payload))
+
+    @classmethod
+    def load(cls, path, page_count):
+        index = cls(path, page_count)
+        stored = shared_thumbnail_cache().get(path, 0, INDEX_VARIANT)
+        if stored is None:
+            return index
+        try:
+            data = json.loads(zlib.decompress(stored).decode("utf-8"))
+        except (ValueError, zlib.error):
+            return index
+        if (data.get("version") == INDEX_VERSION and data.get("identity") == index.identity
+                and data.get("page_count") == page_count):
+            index.postings = data["postings"]
+            index.indexed_pages = page_count
+        return index
+
+
+def search_page(page, query):
+    """Hit rectangles of the query on one page, as (x0, y0, x1, y1) tuples in page space."""
+    return [tuple(rect) for rect in page.search_for(query)]
+
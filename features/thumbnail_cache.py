@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sys
+import threading
+
+DEFAULT_MAX_MB = 200
+# Bytes hashed from each end of the file; the trailer changes on every save
+IDENTITY_SAMPLE_BYTES = 64 * 1024
+
+_identity_lock = threading.Lock()
+_identities = {}
+_shared_cache = None
+
+
+def default_cache_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "PDF Hero")
+
+
+def file_identity(path):
+    """Content address of a PDF: size, mtime and a hash of its header and trailer."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _identity_lock:
+        identity = _identities.get(memo_key)
+    if identity is not None:
+        return identity
+    digest = hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(IDENTITY_SAMPLE_BYTES))
+        if st.st_size > IDENTITY_SAMPLE_BYTES:
+            f.seek(max(IDENTITY_SAMPLE_BYTES, st.st_size - IDENTITY_SAMPLE_BYTES))
+            digest.update(f.read())
+    identity = digest.hexdigest()
+    with _identity_lock:
+        _identities[memo_key] = identity
+    return identity
+
+
+def scale_variant(scale):
+    return f"s{int(round(scale * 1000))}"
+
+
+def size_variant(width, height):
+    return f"{width}x{height}"
+
+
+class ThumbnailDiskCache:
+    """Small encoded page images on disk, keyed by file identity, page and variant.
+
+    Other derived data about a file (its page count, its search index) is
+    kept here too under variants of its own, so one size cap covers it all.
+    Reads refresh an entry's mtime, so pruning past the size cap removes the
+    least recently used files first. Safe to use from render worker threads.
+    """
+
+    def __init__(self, root=None, max_mb=DEFAULT_MAX_MB):
+        self.root = root or os.path.join(default_cache_dir(), "thumbnails")
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._used_bytes = None
+
+    def entry_path(self, identity, page, variant):
+        return os.path.join(self.root, identity[:2], f"{identity}_{page}_{variant}.img")
+
+    def get(self, path, page, variant):
+        try:
+            entry = self.entry_path(file_identity(path), page, variant)
+            with open(entry, "rb") as f:
+                data = f.read()
+            os.utime(entry)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, path, page, variant, data):
+        try:
+            entry = self.entry_path(file_identity(path), page, variant)
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            tmp = f"{entry}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, entry)
+        except OSError as e:
+            print(f"Thumbnail cache write failed: {e}")
+            return
+        with self._lock:
+            if self._used_bytes is not None:
+                self._used_bytes += len(data)
+            self._prune_locked()
+
+    def used_bytes(self):
+        with self._lock:
+            if self._used_bytes is None:
+                self._used_bytes = sum(size for _, size, _ in self._scan())
+            return self._used_bytes
+
+    def clear(self):
+        with self._lock:
+            for entry, _, _ in self._scan():
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+            self._used_bytes = 0
+
+    def _scan(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                entry = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(entry)
+                except OSError:
+                    continue
+                entries.append((entry, st.st_size, st.st_mtime))
+        return entries
+
+    def _prune_locked(self):
+        if self._used_bytes is None:
+            self._used_bytes = sum(size for _, size, _ in self._scan())
+        if self._used_bytes <= self.max_bytes:
+            return
+        # Prune to 90% of the cap so we don't rescan on every following write
+        target = int(self.max_bytes * 0.9)
+        entries = self._scan()
+        self._used_bytes = sum(size for _, size, _ in entries)
+        for entry, size, _ in sorted(entries, key=lambda e: e[2]):
+            if self._used_bytes <= target:
+                break
+            try:
+                os.remove(entry)
+                self._used_bytes -= size
+            except OSError:
+                pass
+
+
+def shared_thumbnail_cache():
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ThumbnailDiskCache()
+    return _shared_cache
@@ -1,19 +1,37 @@
-from PyQt5.QtWidgets import QApplication
-from ui.main_window import MainWindow
+import time
+_started = time.perf_counter()
+
+from ui import startup_report
+startup_report.begin(_started)
+
+with startup_report.timed("PyQt5.QtWidgets"):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+with startup_report.timed("ui.main_window"):
+    from ui.main_window import MainWindow
 import sys
 import os
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    startup_report.mark("QApplication created")
 
-    # Handle double-click or "Open with PDF Hero"
+    # Handle double-click or "Open with PDF Hero": the window opens straight
+    # into the viewer and renders page 0 while the rest is built
+    pdf_path = None
     if len(sys.argv) > 1:
-        pdf_path = sys.argv[1]
-        if os.path.exists(pdf_path) and pdf_path.lower().endswith('.pdf'):
-            window.load_pdf_viewer(pdf_path)
+        if os.path.exists(sys.argv[1]) and sys.argv[1].lower().endswith('.pdf'):
+            pdf_path = sys.argv[1]
+    window = MainWindow(pdf_path)
+    startup_report.mark("main window built")
 
     window.showMaximized()
+    startup_report.mark("window shown")
+    # Runs once the event loop has painted the first frame; with a file the
+    # report is printed when its first page is on screen instead
+    QTimer.singleShot(0, lambda: startup_report.mark("first paint"))
+    if not pdf_path:
+        QTimer.singleShot(0, startup_report.print_report)
     sys.exit(app.exec_())
 
-    
+
@@ -0,0 +1,38 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Write a small PDF whose pages read "<name> <page>", optionally drawing `image` (PNG bytes) on each."""
+
+    def make(name, pages, image=None):
+        doc = fitz.open()
+        for number in range(pages):
+            page = doc.new_page(width=200, height=200)
+            page.insert_text((20, 40), f"{name} {number}")
+            if image is not None:
+                page.insert_image(fitz.Rect(20, 60, 120, 160), stream=image)
+        path = tmp_path / f"{name}.pdf"
+        doc.save(path)
+        doc.close()
+        return str(path)
+
+    return make
+
+
+@pytest.fixture
+def png():
+    """A noisy 64x64 PNG, so its stream is big enough to notice."""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    pix.set_rect(pix.irect, (200, 30, 30))
+    for x in range(0, 64, 3):
+        for y in range(0, 64, 5):
+            pix.set_pixel(x, y, ((x * 7) % 256, (y * 11) % 256, (x * y) % 256))
+    return pix.tobytes("png")
+
+
+def page_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text().strip() for page in doc]
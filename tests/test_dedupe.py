@@ -0,0 +1,55 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PyQt5")
+
+from features.merge import merge_pdfs  # noqa: E402
+from tests.conftest import page_texts  # noqa: E402
+
+
+def image_streams(doc):
+    """xrefs of images that still carry data; emptied duplicates do not count."""
+    return [xref for xref in range(1, doc.xref_length())
+            if doc.xref_get_key(xref, "Subtype")[1] == "/Image" and doc.xref_stream_raw(xref)]
+
+
+def page_fonts(doc):
+    return {font[0] for page in doc for font in page.get_fonts()}
+
+
+@pytest.mark.parametrize("chunk_pages", [100, 1])
+def test_shared_image_is_stored_once(make_pdf, png, tmp_path, chunk_pages):
+    sources = [make_pdf("a", 2, image=png), make_pdf("b", 2, image=png), make_pdf("c", 1, image=png)]
+    out_path = str(tmp_path / "merged.pdf")
+
+    saved = merge_pdfs(sources, out_path, chunk_pages=chunk_pages)
+
+    assert saved > 0
+    with fitz.open(out_path) as doc:
+        assert len(image_streams(doc)) == 1
+        # Every page still shows the image, through the one remaining copy
+        assert {page.get_images()[0][0] for page in doc} == set(image_streams(doc))
+        assert all(page.get_pixmap().width for page in doc)
+    assert page_texts(out_path) == ["a 0", "a 1", "b 0", "b 1", "c 0"]
+
+
+@pytest.mark.parametrize("chunk_pages", [100, 1])
+def test_shared_font_is_stored_once(make_pdf, tmp_path, chunk_pages):
+    sources = [make_pdf("a", 1), make_pdf("b", 1), make_pdf("c", 1)]
+    out_path = str(tmp_path / "merged.pdf")
+
+    merge_pdfs(sources, out_path, chunk_pages=chunk_pages)
+
+    with fitz.open(out_path) as doc:
+        assert len(page_fonts(doc)) == 1
+    assert page_texts(out_path) == ["a 0", "b 0", "c 0"]
+
+
+def test_without_dedupe_every_copy_is_kept(make_pdf, png, tmp_path):
+    sources = [make_pdf("a", 1, image=png), make_pdf("b", 1, image=png)]
+    out_path = str(tmp_path / "merged.pdf")
+
+    assert merge_pdfs(sources, out_path, dedupe=False) == 0
+
+    with fitz.open(out_path) as doc:
+        assert len(image_streams(doc)) == 2
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PyQt5")
+
+from features.merge import MergeCancelled, merge_pdfs  # noqa: E402
+from tests.conftest import page_texts  # noqa: E402
+
+
+def test_pages_keep_their_order_across_chunks(make_pdf, tmp_path):
+    sources = [make_pdf("a", 3), make_pdf("b", 2), make_pdf("c", 4)]
+    out_path = str(tmp_path / "merged.pdf")
+
+    merge_pdfs(sources, out_path, chunk_pages=2)
+
+    expected = [f"{name} {page}" for name, count in (("a", 3), ("b", 2), ("c", 4)) for page in range(count)]
+    assert page_texts(out_path) == expected
+
+
+def test_outlines_are_shifted_to_where_each_file_lands(make_pdf, tmp_path):
+    sources = [make_pdf("a", 2), make_pdf("b", 3)]
+    with fitz.open(sources[1]) as doc:
+        doc.set_toc([[1, "b start", 1], [2, "b end", 3]])
+        doc.saveIncr()
+    out_path = str(tmp_path / "merged.pdf")
+
+    merge_pdfs(sources, out_path, chunk_pages=1)
+
+    with fitz.open(out_path) as doc:
+        assert [entry[:3] for entry in doc.get_toc()] == [[1, "b start", 3], [2, "b end", 5]]
+
+
+def test_cancel_removes_the_part_file(make_pdf, tmp_path):
+    sources = [make_pdf("a", 2), make_pdf("b", 2), make_pdf("c", 2)]
+    out_path = str(tmp_path / "merged.pdf")
+    done = []
+
+    with pytest.raises(MergeCancelled):
+        merge_pdfs(sources, out_path, progress=lambda index, *_: done.append(index),
+                   should_stop=lambda: len(done) >= 2, chunk_pages=2)
+
+    assert not os.path.exists(out_path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_failed_append_restores_the_original_bytes(make_pdf, tmp_path):
+    out_path = make_pdf("existing", 2)
+    with open(out_path, "rb") as f:
+        original = f.read()
+
+    with pytest.raises(Exception):
+        merge_pdfs([make_pdf("a", 2), str(tmp_path / "missing.pdf")], out_path, append=True, chunk_pages=1)
+
+    with open(out_path, "rb") as f:
+        assert f.read() == original
+
+
+def test_append_adds_pages_after_the_existing_ones(make_pdf):
+    out_path = make_pdf("existing", 2)
+
+    merge_pdfs([make_pdf("a", 1), make_pdf("b", 2)], out_path, append=True, chunk_pages=2)
+
+    assert page_texts(out_path) == ["existing 0", "existing 1", "a 0", "b 0", "b 1"]
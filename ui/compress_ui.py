@@ -1,13 +1,21 @@
 import fitz  # PyMuPDF
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog,
-    QHBoxLayout, QScrollArea, QMessageBox, QSizePolicy, QApplication
+    QHBoxLayout, QListView, QMessageBox, QApplication
 )
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QSize
 import io
 from PIL import Image
 
+from features.fitz_lock import FITZ_LOCK
+from ui.file_page_list import FilePageModel, FilePageDelegate
+from ui.thumbnail_list import ThumbnailListView
+
+# Page previews fit this box, about a letter page at 100%
+PREVIEW_SIZE = QSize(612, 792)
+# About 2 MB each, so only a few screens' worth stay in memory
+MAX_PREVIEWS = 12
+
 class PDFCompressorUI(QWidget):
     def __init__(self):
         super().__init__()
@@ -16,7 +24,8 @@ class PDFCompressorUI(QWidget):
 
         self.doc = None
         self.file_path = None
-        self.page_widgets = []
+        # Full-size previews would crowd the small thumbnails out of the disk cache
+        self.model = FilePageModel(self, PREVIEW_SIZE, MAX_PREVIEWS, disk_cache=False)
 
         self.init_ui()
 
@@ -40,16 +49,14 @@ class PDFCompressorUI(QWidget):
         self.status_label = QLabel("No PDF loaded.")
         layout.addWidget(self.status_label)
 
-        # Scroll area to view pages
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-
-        self.content_widget = QWidget()
-        self.content_layout = QVBoxLayout()
-        self.content_widget.setLayout(self.content_layout)
-
-        self.scroll_area.setWidget(self.content_widget)
-        layout.addWidget(self.scroll_area)
+        # Page previews; only the pages in view are rendered
+        self.page_list = ThumbnailListView(overscan=1)
+        self.page_list.setFlow(QListView.TopToBottom)
+        self.page_list.setSpacing(8)
+        self.page_list.setSelectionMode(QListView.NoSelection)
+        self.page_list.setItemDelegate(FilePageDelegate(PREVIEW_SIZE, removable=False, parent=self.page_list))
+        self.page_list.setModel(self.model)
+        layout.addWidget(self.page_list)
 
         self.setLayout(layout)
 
@@ -59,7 +66,8 @@ class PDFCompressorUI(QWidget):
             return
 
         try:
-            self.doc = fitz.open(file)
+            with FITZ_LOCK:
+                self.doc = fitz.open(file)
             self.file_path = file
             self.status_label.setText(f"Loaded: {file} ({len(self.doc)} pages)")
             self.compress_btn.setEnabled(True)
@@ -68,26 +76,20 @@ class PDFCompressorUI(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to load PDF:\n{str(e)}")
 
     def render_pages(self):
-        # Clear existing page widgets
-        for widget in self.page_widgets:
-            widget.setParent(None)
-        self.page_widgets.clear()
-
-        # Render each page to image and display
-        for page_num in range(len(self.doc)):
-            page = self.doc.load_page(page_num)
-            pix = page.get_pixmap(matrix=fitz.Matrix(1, 1))
-            fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
-            image = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
-            pixmap = QPixmap.fromImage(image)
-
-            label = QLabel()
-            label.setPixmap(pixmap)
-            label.setAlignment(Qt.AlignCenter)
-            label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-
-            self.content_layout.addWidget(label)
-            self.page_widgets.append(label)
+        # One row per page; the delegate paints previews as they scroll into view
+        self.model.clear()
+        self.model.add_file(self.file_path, list(range(len(self.doc))))
+
+    def memory_usage(self):
+        return self.model.memory_usage()
+
+    def close_tool(self):
+        """Called by the tool registry before the widget is torn down."""
+        self.model.clear()
+        if self.doc is not None:
+            with FITZ_LOCK:
+                self.doc.close()
+            self.doc = None
 
     def compress_and_save(self):
         if not self.doc:
@@ -95,33 +97,36 @@ class PDFCompressorUI(QWidget):
 
         try:
             for page in self.doc:
-                page.clean_contents()
-                for img in page.get_images(full=True):
-                    xref = img[0]
-                    try:
-                        pix = fitz.Pixmap(self.doc, xref)
-                        if pix.n > 4:
-                            pix = fitz.Pixmap(fitz.csRGB, pix)
-                        # Convert pixmap to PIL Image for aggressive compression
-                        pil_img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        # Resize to 70% (you can adjust this)
-                        pil_img = pil_img.resize((int(pix.width * 0.7), int(pix.height * 0.7)), Image.LANCZOS)
-                        # Save to JPEG buffer with quality 60 (aggressive)
-                        img_buffer = io.BytesIO()
-                        pil_img.save(img_buffer, format="JPEG", quality=60)
-                        img_buffer.seek(0)
-                        # Replace image in PDF
-                        new_xref = self.doc.insert_image(
-                            page.rect, stream=img_buffer.getvalue(), keep_proportion=True
-                        )
-                        page._wrapContents()  # Needed in some PyMuPDF versions
-                        pix = None
-                    except Exception as img_error:
-                        print(f"Skipping image {xref}: {img_error}")
+                # One page at a time, so renders elsewhere get the lock in between
+                with FITZ_LOCK:
+                    page.clean_contents()
+                    for img in page.get_images(full=True):
+                        xref = img[0]
+                        try:
+                            pix = fitz.Pixmap(self.doc, xref)
+                            if pix.n > 4:
+                                pix = fitz.Pixmap(fitz.csRGB, pix)
+                            # Convert pixmap to PIL Image for aggressive compression
+                            pil_img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                            # Resize to 70% (you can adjust this)
+                            pil_img = pil_img.resize((int(pix.width * 0.7), int(pix.height * 0.7)), Image.LANCZOS)
+                            # Save to JPEG buffer with quality 60 (aggressive)
+                            img_buffer = io.BytesIO()
+                            pil_img.save(img_buffer, format="JPEG", quality=60)
+                            img_buffer.seek(0)
+                            # Replace image in PDF
+                            new_xref = self.doc.insert_image(
+                                page.rect, stream=img_buffer.getvalue(), keep_proportion=True
+                            )
+                            page._wrapContents()  # Needed in some PyMuPDF versions
+                            pix = None
+                        except Exception as img_error:
+                            print(f"Skipping image {xref}: {img_error}")
 
             out_path, _ = QFileDialog.getSaveFileName(self, "Save Compressed PDF", "compressed.pdf", "PDF Files (*.pdf)")
             if out_path:
-                self.doc.save(out_path, garbage=4, deflate_images=True, clean=True)
+                with FITZ_LOCK:
+                    self.doc.save(out_path, garbage=4, deflate_images=True, clean=True)
                 QMessageBox.information(self, "Success", f"Compressed PDF saved to:\n{out_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Compression failed:\n{str(e)}")
@@ -0,0 +1,312 @@
+import os
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt5.QtGui import QPixmap, QColor, QFont, QFontMetrics, QPainter
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, QMimeData, QEvent, pyqtSignal
+
+from ui.render_engine import PageRenderEngine, PageCountRequest
+from ui.thumbnail_list import THUMBNAIL_PRIORITY, MAX_CACHED_THUMBNAILS
+
+ROWS_MIME_TYPE = "application/x-pdfhero-rows"
+NAME_HEIGHT = 20
+REMOVE_SIZE = 22
+ITEM_PADDING = 7
+
+
+class FilePageModel(QAbstractListModel):
+    """Rows of (file, page) with thumbnails rendered on demand, for lists of files or of their pages.
+
+    Only rows the view asks for through request_rows() are rendered, and
+    at most `max_cached` thumbnails are kept, so memory follows what is on
+    screen rather than the row count. Renders are kept in the shared
+    thumbnail disk cache unless `disk_cache` is off, as it should be for
+    images too large to be worth storing. Rows can be reordered by drag and
+    drop.
+    """
+
+    # A file's page count became known: (path, count)
+    page_count_known = pyqtSignal(str, int)
+
+    def __init__(self, parent=None, thumb_size=QSize(110, 150), max_cached=MAX_CACHED_THUMBNAILS, disk_cache=True):
+        super().__init__(parent)
+        self.thumb_size = thumb_size
+        self.max_cached = max_cached
+        self.disk_cache = disk_cache
+        self.entries = []
+        # (path, page) -> row, so arriving thumbnails find their row directly
+        self.rows = {}
+        # path -> number of rows it has; files shown page by page get page numbers
+        self.row_counts = {}
+        # path -> pages in the file, learnt from first-page thumbnails or request_page_count()
+        self.page_counts = {}
+        self.thumbnails = OrderedDict()
+        self.requests = {}
+        # path -> PageCountRequest; kept apart from `requests`, which follow the view
+        self.count_requests = {}
+        self.engine = PageRenderEngine(self)
+        self.engine.page_ready.connect(self.on_thumbnail_rendered)
+        self.engine.render_failed.connect(self.on_thumbnail_failed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path, page = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            name = os.path.basename(path)
+            return name if self.row_counts.get(path) == 1 else f"{name} · p{page + 1}"
+        if role == Qt.DecorationRole:
+            return self.thumbnails.get((path, page))
+        if role == Qt.UserRole:
+            return path
+        if role == Qt.ToolTipRole:
+            return path
+        return None
+
+    def add_file(self, path, pages=(0,)):
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(pages) - 1)
+        self.entries.extend((path, page) for page in pages)
+        self.rows.update({(path, page): first + i for i, page in enumerate(pages)})
+        self.row_counts[path] = self.row_counts.get(path, 0) + len(pages)
+        self.endInsertRows()
+
+    def set_entries(self, entries):
+        """Replace every row at once, keeping thumbnails of pages that are still listed."""
+        self.beginResetModel()
+        self.entries = list(entries)
+        self.row_counts = {}
+        for path, _ in self.entries:
+            self.row_counts[path] = self.row_counts.get(path, 0) + 1
+        self._reindex()
+        self.endResetModel()
+
+    def add_pages(self, path, pages):
+        """List more pages of a file, after its first page's row and the rows of the file that follow it."""
+        pages = [page for page in pages if (path, page) not in self.rows]
+        last = self.rows.get((path, 0))
+        if last is None or not pages:
+            return
+        while last + 1 < len(self.entries) and self.entries[last + 1][0] == path:
+            last += 1
+        self.beginInsertRows(QModelIndex(), last + 1, last + len(pages))
+        self.entries[last + 1:last + 1] = [(path, page) for page in pages]
+        self.row_counts[path] += len(pages)
+        self._reindex()
+        self.endInsertRows()
+
+    def _reindex(self):
+        self.rows = {entry: row for row, entry in enumerate(self.entries)}
+
+    def remove_path(self, path):
+        # A file's rows are normally contiguous, so this is one removal, not one per page
+        row = len(self.entries) - 1
+        while row >= 0:
+            if self.entries[row][0] != path:
+                row -= 1
+                continue
+            last = row
+            while row > 0 and self.entries[row - 1][0] == path:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            del self.entries[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+        self._reindex()
+        self.row_counts.pop(path, None)
+        self.page_counts.pop(path, None)
+        self.engine.cancel(self.count_requests.pop(path, None))
+        for key in [key for key in self.thumbnails if key[0] == path]:
+            del self.thumbnails[key]
+
+    def clear(self):
+        self.beginResetModel()
+        self.engine.new_generation()
+        self.entries.clear()
+        self.rows.clear()
+        self.row_counts.clear()
+        self.page_counts.clear()
+        self.thumbnails.clear()
+        self.requests.clear()
+        self.count_requests.clear()
+        self.endResetModel()
+
+    def paths(self):
+        """Files in list order, each once."""
+        return list(OrderedDict.fromkeys(path for path, _ in self.entries))
+
+    def request_rows(self, first, last):
+        """Render thumbnails for rows [first, last] and drop queued work for everything else."""
+        wanted = set(self.entries[max(0, first):max(0, last + 1)])
+        for key, request in list(self.requests.items()):
+            if key not in wanted:
+                self.engine.cancel(request)
+                del self.requests[key]
+        for key in wanted:
+            if key in self.thumbnails:
+                self.thumbnails.move_to_end(key)
+            elif key not in self.requests:
+                path, page = key
+                self.requests[key] = self.engine.request_thumbnail(
+                    path, page, self.thumb_size.width(), self.thumb_size.height(), THUMBNAIL_PRIORITY,
+                    self.disk_cache
+                )
+
+    def request_page_count(self, path):
+        """Count a file's pages on the render thread; page_count_known follows."""
+        if path not in self.page_counts and path not in self.count_requests:
+            self.count_requests[path] = self.engine.request_page_count(path, THUMBNAIL_PRIORITY)
+
+    def memory_usage(self):
+        return sum(pixmap.width() * pixmap.height() * 4 for pixmap in self.thumbnails.values())
+
+    def on_thumbnail_rendered(self, request, image):
+        if getattr(request, "page_count", None) is not None and request.path in self.row_counts:
+            if self.page_counts.get(request.path) != request.page_count:
+                self.page_counts[request.path] = request.page_count
+                self.page_count_known.emit(request.path, request.page_count)
+        if isinstance(request, PageCountRequest):
+            self.count_requests.pop(request.path, None)
+            return
+        key = (request.path, request.page)
+        self.requests.pop(key, None)
+        self.thumbnails[key] = QPixmap.fromImage(image)
+        while len(self.thumbnails) > self.max_cached:
+            self.thumbnails.popitem(last=False)
+        row = self.rows.get(key)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def on_thumbnail_failed(self, request, error):
+        if isinstance(request, PageCountRequest):
+            self.count_requests.pop(request.path, None)
+        else:
+            self.requests.pop((request.path, request.page), None)
+        print(f"Thumbnail error: {error}")
+
+    # Reordering by drag and drop
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        data = QMimeData()
+        rows = sorted({index.row() for index in indexes})
+        data.setData(ROWS_MIME_TYPE, ",".join(map(str, rows)).encode())
+        return data
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if action != Qt.MoveAction or not data.hasFormat(ROWS_MIME_TYPE):
+            return False
+        rows = [int(r) for r in bytes(data.data(ROWS_MIME_TYPE)).decode().split(",") if r]
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self.entries)
+        self.move_rows(rows, row)
+        # The rows are already moved; returning False stops the view from removing the originals
+        return False
+
+    def moveRows(self, source_parent, source_row, count, destination_parent, destination_row):
+        last = source_row + count - 1
+        if count <= 0 or source_row <= destination_row <= last + 1:
+            return False
+        if not self.beginMoveRows(QModelIndex(), source_row, last, QModelIndex(), destination_row):
+            return False
+        moving = self.entries[source_row:last + 1]
+        del self.entries[source_row:last + 1]
+        insert_at = destination_row - count if destination_row > last else destination_row
+        self.entries[insert_at:insert_at] = moving
+        self._reindex()
+        self.endMoveRows()
+        return True
+
+    def move_rows(self, rows, destination):
+        """Move `rows`, in order, to sit together before row `destination`."""
+        position = destination
+        for key in [self.entries[r] for r in sorted(rows)]:
+            row = self.rows[key]
+            if row < position:
+                if row != position - 1:
+                    self.moveRows(QModelIndex(), row, 1, QModelIndex(), position)
+            else:
+                if row != position:
+                    self.moveRows(QModelIndex(), row, 1, QModelIndex(), position)
+                position += 1
+
+
+class FilePageDelegate(QStyledItemDelegate):
+    """Paints a thumbnail, its name and, when `removable`, a ✖ that removes the row's file."""
+
+    remove_requested = pyqtSignal(str)
+
+    def __init__(self, thumb_size=QSize(110, 150), removable=True, parent=None):
+        super().__init__(parent)
+        self.thumb_size = thumb_size
+        self.removable = removable
+        self.font = QFont("Segoe UI", 9, QFont.Bold)
+
+    def sizeHint(self, option, index):
+        height = self.thumb_size.height() + NAME_HEIGHT + (REMOVE_SIZE if self.removable else 0)
+        return QSize(self.thumb_size.width() + 2 * ITEM_PADDING, height + 2 * ITEM_PADDING)
+
+    def thumb_rect(self, rect):
+        return QRect(rect.x() + ITEM_PADDING, rect.y() + ITEM_PADDING, self.thumb_size.width(), self.thumb_size.height())
+
+    def remove_rect(self, rect):
+        top = self.thumb_rect(rect).bottom() + NAME_HEIGHT
+        return QRect(rect.center().x() - REMOVE_SIZE // 2, top, REMOVE_SIZE, REMOVE_SIZE)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        thumb_rect = self.thumb_rect(rect)
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is None:
+            painter.fillRect(thumb_rect, QColor("#ffffff"))
+            painter.setPen(QColor("#d5dae3"))
+            painter.drawRect(thumb_rect.adjusted(0, 0, -1, -1))
+        else:
+            size = pixmap.size().scaled(thumb_rect.size(), Qt.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(thumb_rect.center())
+            painter.drawPixmap(target, pixmap)
+        if option.state & QStyle.State_Selected:
+            painter.setPen(QColor("#4e82f1"))
+            painter.drawRect(thumb_rect.adjusted(-2, -2, 1, 1))
+
+        name_rect = QRect(rect.x(), thumb_rect.bottom() + 2, rect.width(), NAME_HEIGHT)
+        painter.setFont(self.font)
+        painter.setPen(QColor("#6073a1"))
+        name = QFontMetrics(self.font).elidedText(index.data(Qt.DisplayRole) or "", Qt.ElideMiddle, rect.width() - 4)
+        painter.drawText(name_rect, Qt.AlignCenter, name)
+
+        if self.removable:
+            remove_rect = self.remove_rect(rect)
+            if hovered:
+                painter.setRenderHint(QPainter.Antialiasing)
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor("#fff2f2"))
+                painter.drawRoundedRect(remove_rect, 6, 6)
+            painter.setPen(QColor("#e84d4d") if hovered else QColor("#6e7ca0"))
+            painter.drawText(remove_rect, Qt.AlignCenter, "✖")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (self.removable and event.type() == QEvent.MouseButtonRelease
+                and event.button() == Qt.LeftButton and self.remove_rect(option.rect).contains(event.pos())):
+            self.remove_requested.emit(index.data(Qt.UserRole))
+            return True
+        return super().editorEvent(event, model, option, index)
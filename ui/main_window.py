@@ -2,27 +2,68 @@ import sys
 import os
 from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QStackedWidget
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QSize
-
-from features import merge, split, annotate, compress, convert, ocr
-from ui.merge_ui import MergeWidget
-from ui.image_to_pdf_ui import ImagesToPDFWidget
-from ui.pdf_viewer_ui import PDFViewerWidget
-from ui.pdf_editor_ui import PdfEditorWidget
-from ui.compress_ui import PDFCompressorUI
-from ui.pdf_to_image_ui import PDFToJPGWidget
-from ui.virtualized_pdf_viewer import VirtualizedPDFViewer
-from ui.convert_dashboard import ConvertDashboard
-from ui.pdf_to_word_widget import PDFToWordWidget
- 
+from PyQt5.QtCore import QSize, QTimer
+
+from ui.tool_registry import ToolRegistry, ToolSpec
+from ui import startup_report
+from ui.startup_report import load_object
+
+# Sidebar entries. Targets are imported on first click, so startup does not
+# pay for pdf2docx, pdf2image, PyPDF2 or pytesseract
+TOOLS = [
+    ToolSpec("viewer", "Viewer", "view.png", "ui.viewer_tabs:ViewerTabs"),
+    ToolSpec("editor", "Editor PDF", "view.png", "ui.pdf_editor_ui:PdfEditorWidget"),
+    ToolSpec("merge", "Merge", "merge.png", "ui.merge_ui:MergeWidget"),
+    ToolSpec("split", "Split", "split.png", "features.split:run", action=True),
+    ToolSpec("annotate", "Annotate", "annotate.png", "features.annotate:run", action=True),
+    ToolSpec("compress", "Compress", "compress.png", "ui.compress_ui:PDFCompressorUI"),
+    ToolSpec("convert", "Convert", "convert.png", "ui.convert_dashboard:ConvertDashboard"),
+    ToolSpec("ocr", "OCR", "ocr.png", "features.ocr:run", action=True),
+    ToolSpec("pdf_to_jpg", "PDF to Image", "convert.png", "ui.pdf_to_image_ui:PDFToJPGWidget"),
+    ToolSpec("image_to_pdf", "Image to PDF", "convert.png", "ui.image_to_pdf_ui:ImagesToPDFWidget"),
+]
+
+CONVERTERS = {
+    "pdf_to_word": "ui.pdf_to_word_widget:PDFToWordWidget",
+}
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, pdf_path=None):
         super().__init__()
         self.setWindowTitle("PDF Hero Pro")
         self.setMinimumSize(1000, 700)
         self.setMinimumSize(1000, 700)
+        if pdf_path:
+            self.init_fast_path(pdf_path)
+            return
         self.load_styles()
         self.init_ui()
+        self.init_sidebar()
+
+    def init_fast_path(self, pdf_path):
+        """Launched with a file ("open with"): get page 0 on screen before anything else.
+
+        The document opens first so its first page renders on the worker pool
+        while the window is put together; the style sheet and sidebar wait for
+        the first frame, thumbnails and search indexing for the first page.
+        """
+        self.init_ui()
+        self.startup_viewer = self.load_pdf_viewer(pdf_path, defer_extras=True)
+        self.startup_viewer.first_page_shown.connect(self.on_first_page_shown)
+        startup_report.mark("document opened")
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        self.load_styles()
+        self.init_sidebar()
+        startup_report.mark("sidebar and styles ready")
+
+    def on_first_page_shown(self):
+        # Only the launch counts; later opens in the same viewer emit this again
+        self.startup_viewer.first_page_shown.disconnect(self.on_first_page_shown)
+        startup_report.mark("first page rendered")
+        startup_report.record("time_to_first_page", startup_report.elapsed())
+        startup_report.print_report()
     
     def load_styles(self):
         # This handles both dev mode and PyInstaller bundled mode
@@ -37,41 +78,27 @@ class MainWindow(QMainWindow):
                 self.setStyleSheet(f.read())
 
     def init_ui(self):
-        # Sidebar with buttons
-        sidebar = QVBoxLayout()
-        tools = [
-            ("Viewer", "view.png", self.load_pdf_viewer),
-            ("Editor PDF", "view.png", self.load_pdf_editor),
-            ("Merge", "merge.png", self.load_merge_ui),
-            ("Split", "split.png", split.run),
-            ("Annotate", "annotate.png", annotate.run),
-            ("Compress", "compress.png", self.load_compress_pdf),
-            ("Convert", "convert.png", self.load_convert_dashboard),
-            ("OCR", "ocr.png", ocr.run),
-            ("PDF to Image", "convert.png", self.load_pdf_to_jpg_ui),
-            ("Image to PDF", "convert.png", self.load_image_to_pdf_ui),
-        ]
-
-        for name, icon_file, func in tools:
-            btn = QPushButton(name)
-            icon_path = os.path.join("resources", "icons", icon_file)
-            btn.setIcon(QIcon(icon_path))
-            btn.setIconSize(QSize(24, 24))
-            btn.setObjectName("sidebarButton")
-            btn.clicked.connect(func)
-            sidebar.addWidget(btn)
-
-        sidebar.addStretch()
+        # Sidebar with buttons, filled in by init_sidebar
+        self.sidebar = QVBoxLayout()
 
         # Placeholder stacked panel
         self.stack = QStackedWidget()
         self.viewer_placeholder = QLabel("PDF Viewer Placeholder")
         self.stack.addWidget(self.viewer_placeholder)
 
+        # Each tool is built once, reused on every click and closed when idle
+        self.tools = ToolRegistry(self.stack, parent=self)
+        self.actions = {}
+        for spec in TOOLS:
+            if spec.action:
+                self.actions[spec.name] = spec.target
+            else:
+                self.tools.register_lazy(spec.name, spec.target)
+
         # Layout setup
         main_layout = QHBoxLayout()
         sidebar_widget = QWidget()
-        sidebar_widget.setLayout(sidebar)
+        sidebar_widget.setLayout(self.sidebar)
         main_layout.addWidget(sidebar_widget, 1)
         main_layout.addWidget(self.stack, 5)
 
@@ -79,10 +106,28 @@ class MainWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+    def init_sidebar(self):
+        for spec in TOOLS:
+            btn = QPushButton(spec.label)
+            icon_path = os.path.join("resources", "icons", spec.icon)
+            btn.setIcon(QIcon(icon_path))
+            btn.setIconSize(QSize(24, 24))
+            btn.setObjectName("sidebarButton")
+            btn.clicked.connect(lambda checked=False, name=spec.name: self.open_tool(name))
+            self.sidebar.addWidget(btn)
+
+        self.sidebar.addStretch()
+
+    def open_tool(self, name):
+        if name in self.actions:
+            load_object(self.actions[name])()
+        elif name == "viewer":
+            self.load_pdf_viewer()
+        else:
+            self.tools.show(name)
+
     def load_merge_ui(self):
-        merge_widget = MergeWidget()
-        self.stack.addWidget(merge_widget)
-        self.stack.setCurrentWidget(merge_widget)
+        self.tools.show("merge")
 
     # def load_image_to_pdf_ui(self):
     #     widget = ImageToPdfUI()
@@ -94,15 +139,14 @@ class MainWindow(QMainWindow):
     #     self.stack.addWidget(widget)
     #     self.stack.setCurrentWidget(widget)
   
-    def load_pdf_viewer(self, pdf_path=None):
-        viewer_widget = VirtualizedPDFViewer()
+    def load_pdf_viewer(self, pdf_path=None, defer_extras=False):
+        # One tab widget for every opened document; they share a render budget
+        viewer_tabs = self.tools.show("viewer")
         # viewer_widget = PDFViewerWidget()
 
-        if pdf_path:  # ✅ Load PDF immediately if a file path is provided
-            viewer_widget.open_pdf_from_path(pdf_path)
-
-        self.stack.addWidget(viewer_widget)
-        self.stack.setCurrentWidget(viewer_widget)
+        if pdf_path or viewer_tabs.count() == 0:  # ✅ Load PDF immediately if a file path is provided
+            return viewer_tabs.open_document(pdf_path, defer_extras=defer_extras)
+        return viewer_tabs.currentWidget()
 
          
         
@@ -116,43 +160,29 @@ class MainWindow(QMainWindow):
 
 
     def load_pdf_editor(self, checked=False):
-        editor_widget = PdfEditorWidget()
-        self.stack.addWidget(editor_widget)
-        self.stack.setCurrentWidget(editor_widget)
+        self.tools.show("editor")
 
     def load_compress_pdf(self, checked=False):
-        editor_widget = PDFCompressorUI()
-        self.stack.addWidget(editor_widget)
-        self.stack.setCurrentWidget(editor_widget)
+        self.tools.show("compress")
 
     def load_pdf_to_jpg_ui(self, checked=False):
-        editor_widget = PDFToJPGWidget()
-        self.stack.addWidget(editor_widget)
-        self.stack.setCurrentWidget(editor_widget)
+        self.tools.show("pdf_to_jpg")
         
     def load_image_to_pdf_ui(self, checked=False):
-        editor_widget = ImagesToPDFWidget()
-        self.stack.addWidget(editor_widget)
-        self.stack.setCurrentWidget(editor_widget)
+        self.tools.show("image_to_pdf")
         
     def load_convert_dashboard(self):
-        if not hasattr(self, "convert_dashboard"):
-         from ui.convert_dashboard import ConvertDashboard
-        self.convert_dashboard = ConvertDashboard(self)
-        self.stack.addWidget(self.convert_dashboard)
-        self.stack.setCurrentWidget(self.convert_dashboard)
+        self.tools.show("convert")
         
     def open_converter(self, which):
-        if which == "pdf_to_word":
-            from ui.pdf_to_word_widget import PDFToWordWidget
-            widget = PDFToWordWidget()
-    # ...other converters...
-        else:
-            from PyQt5.QtWidgets import QLabel
-            widget = QLabel("Feature not implemented yet.")
-
-        self.stack.addWidget(widget)
-        self.stack.setCurrentWidget(widget)
-
-    
-
+        name = f"convert:{which}"
+        if not self.tools.is_registered(name):
+            if which in CONVERTERS:
+                self.tools.register_lazy(name, CONVERTERS[which])
+        # ...other converters...
+            else:
+                self.tools.register(name, lambda: QLabel("Feature not implemented yet."))
+        self.tools.show(name)
+
+    def tool_memory_report(self):
+        return self.tools.format_memory_report()
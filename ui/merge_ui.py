@@ -1,22 +1,28 @@
-import os, sys, tempfile, subprocess
+import os, sys, subprocess
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog,
-    QListWidget, QListWidgetItem, QAbstractItemView, QMessageBox, QProgressDialog,
-    QToolButton, QSizePolicy, QStatusBar, QSpacerItem
+    QListView, QAbstractItemView, QMessageBox, QProgressBar,
+    QSizePolicy, QStatusBar, QSpacerItem
 )
-from PyQt5.QtGui import QPixmap, QFont
 from PyQt5.QtCore import Qt, QSize
-from PyPDF2 import PdfMerger
-from pdf2image import convert_from_path
 from ui.success_dialog import SuccessDialog
+from ui.merge_worker import MergeWorker
+from ui.file_page_list import FilePageModel, FilePageDelegate
+from ui.thumbnail_list import ThumbnailListView
+
+THUMB_SIZE = QSize(110, 150)
+# A few screens' worth of thumbnails; the rest are re-read from the disk cache
+MAX_THUMBNAILS = 400
 
 class MergeWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.pdf_paths = []
-        self.thumb_files = []
         self.full_preview_mode = False
-        self.temp_dir = tempfile.mkdtemp()
+        self.merge_worker = None
+        # Thumbnails of the rows in view render in parallel on the shared pool
+        self.model = FilePageModel(self, THUMB_SIZE, MAX_THUMBNAILS)
+        self.model.page_count_known.connect(self.on_page_count_known)
         self.setAcceptDrops(True)
         self.init_ui()
 
@@ -28,7 +34,7 @@ class MergeWidget(QWidget):
                 font-size: 16px; padding: 40px 8px; border-radius: 20px;
                 background: #f9fbff;
             }
-            QListWidget {
+            QListView {
                 background: #fff; border-radius: 12px;
                 padding: 12px 6px 12px 6px; min-height: 180px;
             }
@@ -51,12 +57,19 @@ class MergeWidget(QWidget):
         self.instructions.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.instructions)
 
-        self.list_widget = QListWidget()
-        self.list_widget.setViewMode(QListWidget.IconMode)
-        self.list_widget.setIconSize(QSize(110, 150))
+        # Items are painted by the delegate, so thousands of pages cost no widgets
+        self.list_widget = ThumbnailListView()
+        self.list_widget.setViewMode(QListView.IconMode)
+        self.list_widget.setResizeMode(QListView.Adjust)
+        self.list_widget.setMovement(QListView.Snap)
         self.list_widget.setDragDropMode(QAbstractItemView.InternalMove)
+        self.list_widget.setDefaultDropAction(Qt.MoveAction)
         self.list_widget.setSpacing(12)
-        self.list_widget.setSelectionMode(QAbstractItemView.NoSelection)
+        self.list_widget.setMouseTracking(True)
+        self.delegate = FilePageDelegate(THUMB_SIZE, removable=True, parent=self.list_widget)
+        self.delegate.remove_requested.connect(self.remove_by_path)
+        self.list_widget.setItemDelegate(self.delegate)
+        self.list_widget.setModel(self.model)
         layout.addWidget(self.list_widget)
 
         # Button row
@@ -84,6 +97,20 @@ class MergeWidget(QWidget):
         btn_row.addWidget(self.merge_btn)
 
         layout.addLayout(btn_row)
+
+        # Merge progress; the merge itself runs on a worker thread
+        progress_row = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        progress_row.addWidget(self.progress_bar)
+        self.cancel_btn = QPushButton("✖ Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_merge)
+        progress_row.addWidget(self.cancel_btn)
+        layout.addLayout(progress_row)
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+
         self.status_bar = QStatusBar()
         layout.addWidget(self.status_bar)
 
@@ -108,116 +135,112 @@ class MergeWidget(QWidget):
         for f in files:
             if f not in self.pdf_paths:
                 self.add_to_list(f)
-        if self.list_widget.count() > 0:
+        if self.model.rowCount() > 0:
             self.instructions.hide()
         else:
             self.instructions.show()
 
+    def preview_pages(self, filepath):
+        # Counts usually come with the first page's thumbnail; until a file's
+        # arrives, it is shown by its first page alone
+        if not self.full_preview_mode:
+            return [0]
+        count = self.model.page_counts.get(filepath)
+        if count is None:
+            self.model.request_page_count(filepath)
+            return [0]
+        return list(range(count))
+
+    def on_page_count_known(self, filepath, count):
+        if self.full_preview_mode:
+            self.model.add_pages(filepath, range(1, count))
+
     def add_to_list(self, filepath):
         self.pdf_paths.append(filepath)
-        try:
-            images = convert_from_path(filepath, size=(110, 150) if not self.full_preview_mode else None)
-            image_count = 1 if not self.full_preview_mode else len(images)
-            for i in range(image_count):
-                thumb_path = os.path.join(self.temp_dir, f"thumb_{os.path.basename(filepath)}_{i+1}.jpg")
-                images[i].save(thumb_path, "JPEG")
-                self.thumb_files.append(thumb_path)
-                pixmap = QPixmap(thumb_path)
-
-                frame = QWidget()
-                v_layout = QVBoxLayout(frame)
-                v_layout.setContentsMargins(0, 0, 0, 0)
-                icon_label = QLabel()
-                icon_label.setPixmap(pixmap.scaled(110, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                icon_label.setAlignment(Qt.AlignCenter)
-                name_label = QLabel(os.path.basename(filepath))
-                name_label.setAlignment(Qt.AlignCenter)
-                name_label.setFont(QFont("Segoe UI", 9, QFont.Bold))
-                name_label.setStyleSheet("color: #6073a1;")
-
-                remove_btn = QToolButton()
-                remove_btn.setText("✖")
-                remove_btn.setFixedSize(22, 22)
-                remove_btn.setStyleSheet("QToolButton { border: none; } QToolButton:hover { color: #e84d4d; background:#fff2f2; }")
-                remove_btn.clicked.connect(lambda _, fp=filepath: self.remove_by_path(fp))
-
-                v_layout.addWidget(icon_label)
-                v_layout.addWidget(name_label)
-                v_layout.addWidget(remove_btn, alignment=Qt.AlignHCenter)
-
-                item = QListWidgetItem()
-                self.list_widget.addItem(item)
-                self.list_widget.setItemWidget(item, frame)
-                item.setSizeHint(QSize(124, 188))
-                item.setData(Qt.UserRole, filepath)
-        except Exception as e:
-            print(f"Thumbnail error: {e}")
-
-        self.instructions.setVisible(self.list_widget.count() == 0)
+        self.model.add_file(filepath, self.preview_pages(filepath))
+        self.instructions.setVisible(self.model.rowCount() == 0)
 
     def remove_by_path(self, filepath):
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(Qt.UserRole) == filepath:
-                self.list_widget.takeItem(i)
-                break
+        # In full-page preview a file has one row per page
+        self.model.remove_path(filepath)
         if filepath in self.pdf_paths:
             self.pdf_paths.remove(filepath)
-        for thumb in list(self.thumb_files):
-            if filepath and filepath in thumb and os.path.exists(thumb):
-                os.remove(thumb)
-                self.thumb_files.remove(thumb)
-        self.instructions.setVisible(self.list_widget.count() == 0)
+        self.instructions.setVisible(self.model.rowCount() == 0)
         self.status_bar.showMessage(f"Removed {os.path.basename(filepath)}", 3000)
 
     def remove_all_files(self):
-        self.list_widget.clear()
+        self.model.clear()
         self.pdf_paths.clear()
-        for thumb in self.thumb_files:
-            if os.path.exists(thumb):
-                os.remove(thumb)
-        self.thumb_files.clear()
         self.instructions.show()
         self.status_bar.showMessage("🗑 All files removed.", 3000)
 
     def toggle_preview_mode(self):
+        # Swap the rows in place, in the current file order: the view renders
+        # only what scrolls into sight and first pages keep their thumbnails
         self.full_preview_mode = not self.full_preview_mode
-        current_pdfs = list(self.pdf_paths)
-        self.remove_all_files()
-        for f in current_pdfs:
-            self.add_to_list(f)
+        entries = []
+        for path in self.model.paths():
+            entries.extend((path, page) for page in self.preview_pages(path))
+        self.model.set_entries(entries)
         self.status_bar.showMessage("🖼 Full-page preview ON" if self.full_preview_mode else "🖼 Single-page preview ON", 3000)
 
     def merge_files(self):
-        if self.list_widget.count() < 2:
+        ordered_paths = self.model.paths()
+        if len(ordered_paths) < 2:
             QMessageBox.warning(self, "Add PDFs", "Please add at least two PDF files.")
             return
 
-        ordered_paths = []
-        seen = set()
-        for i in range(self.list_widget.count()):
-            path = self.list_widget.item(i).data(Qt.UserRole)
-            if path not in seen:
-                ordered_paths.append(path)
-                seen.add(path)
+        out_path, _ = QFileDialog.getSaveFileName(self, "Save Merged PDF", "merged.pdf", "PDF Files (*.pdf)")
+        if not out_path:
+            return
+
+        self.merge_worker = MergeWorker(ordered_paths, out_path)
+        self.merge_worker.progress.connect(self.on_merge_progress)
+        self.merge_worker.sharing.connect(self.on_merge_sharing)
+        self.merge_worker.merged.connect(self.on_merge_done)
+        self.merge_worker.failed.connect(self.on_merge_failed)
+        self.merge_worker.cancelled.connect(self.on_merge_cancelled)
+        self.set_merging(True)
+        self.merge_worker.start()
 
-        merger = PdfMerger()
-        progress = QProgressDialog("Merging PDFs...", None, 0, len(ordered_paths), self)
-        progress.setWindowModality(Qt.WindowModal)
-        progress.setMinimumDuration(0)
+    def set_merging(self, merging):
+        self.merge_btn.setEnabled(not merging)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(merging)
+        self.cancel_btn.setVisible(merging)
+        self.cancel_btn.setEnabled(True)
 
-        for i, path in enumerate(ordered_paths):
-            merger.append(path)
-            progress.setValue(i + 1)
+    def cancel_merge(self):
+        if self.merge_worker is not None and self.merge_worker.isRunning():
+            self.merge_worker.stop()
+            self.cancel_btn.setEnabled(False)
+            self.status_bar.showMessage("Cancelling merge…")
 
-        out_path, _ = QFileDialog.getSaveFileName(self, "Save Merged PDF", "merged.pdf", "PDF Files (*.pdf)")
-        if out_path:
-            merger.write(out_path)
-            merger.close()
-            self.remove_all_files()
-            SuccessDialog(f"PDFs merged and saved to:\n{out_path}").exec_()
-            self.status_bar.showMessage(f"✅ Merged PDF saved to: {out_path}", 5000)
-            self.open_file(out_path)
+    def on_merge_progress(self, file_index, file_count, page, page_count, name):
+        done = (file_index + page / max(1, page_count)) / max(1, file_count)
+        self.progress_bar.setValue(int(done * 1000))
+        self.status_bar.showMessage(f"Merging {name} ({file_index + 1}/{file_count}) — page {page}/{page_count}")
+
+    def on_merge_sharing(self, done, total):
+        self.status_bar.showMessage(f"Sharing identical fonts and images… {done}/{total}")
+
+    def on_merge_done(self, out_path, saved):
+        self.set_merging(False)
+        self.remove_all_files()
+        SuccessDialog(f"PDFs merged and saved to:\n{out_path}").exec_()
+        message = f"✅ Merged PDF saved to: {out_path}"
+        if saved > 0:
+            message += f" (shared resources saved {saved / (1024 * 1024):.1f} MB)"
+        self.status_bar.showMessage(message, 5000)
+        self.open_file(out_path)
+
+    def on_merge_failed(self, error):
+        self.set_merging(False)
+        QMessageBox.critical(self, "Merge failed", f"Could not merge PDFs:\n{error}")
+
+    def on_merge_cancelled(self):
+        self.set_merging(False)
+        self.status_bar.showMessage("Merge cancelled; no output was written.", 5000)
 
     def open_file(self, path):
         try:
@@ -230,9 +253,20 @@ class MergeWidget(QWidget):
         except Exception as e:
             print(f"Could not open file automatically: {e}")
 
-    def closeEvent(self, event):
-        # Clean up thumbnails when the widget is closed
-        for thumb in self.thumb_files:
-            if os.path.exists(thumb):
-                os.remove(thumb)
-        super().closeEvent(event)
+    def is_busy(self):
+        return self.merge_worker is not None and self.merge_worker.isRunning()
+
+    def has_unsaved(self):
+        # The list the user built up; tearing the tool down would empty it
+        return self.model.rowCount() > 0
+
+    def close_tool(self):
+        """Called by the tool registry before the widget is torn down."""
+        if self.merge_worker is not None and self.merge_worker.isRunning():
+            self.merge_worker.stop()
+            self.merge_worker.wait()
+        self.model.clear()
+        self.pdf_paths.clear()
+
+    def memory_usage(self):
+        return self.model.memory_usage()
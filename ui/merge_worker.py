@@ -0,0 +1,41 @@
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from features.merge import merge_pdfs, MergeCancelled
+
+
+class MergeWorker(QThread):
+    """Merges PDFs off the GUI thread, reporting progress per file and per page."""
+    # file index, file count, page, page count, file name
+    progress = pyqtSignal(int, int, int, int, str)
+    # objects examined, objects in the chunk, while sharing identical resources
+    sharing = pyqtSignal(int, int)
+    # output path, bytes saved by sharing resources
+    merged = pyqtSignal(str, object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, paths, out_path):
+        super().__init__()
+        self.paths = list(paths)
+        self.out_path = out_path
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        def report(file_index, file_count, page, page_count):
+            name = os.path.basename(self.paths[file_index])
+            self.progress.emit(file_index, file_count, page, page_count, name)
+
+        try:
+            saved = merge_pdfs(self.paths, self.out_path, progress=report, should_stop=lambda: self._stop,
+                               dedupe_progress=self.sharing.emit)
+        except MergeCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.merged.emit(self.out_path, saved)
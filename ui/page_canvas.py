@@ -0,0 +1,288 @@
+from PyQt5.QtWidgets import QAbstractScrollArea
+from PyQt5.QtGui import QPainter, QPixmap, QColor
+from PyQt5.QtCore import Qt, QRect, QRectF, pyqtSignal
+
+from ui.render_engine import TILE_SIZE
+
+SCROLL_STEP = 48
+HIGHLIGHT_COLOR = QColor(255, 220, 0, 90)
+CURRENT_HIGHLIGHT_COLOR = QColor(255, 140, 0, 110)
+
+
+class PageChrome:
+    """What a page looks like before its render arrives: drop shadow, border and paper.
+
+    The chrome is drawn once, around a tiny page, into a nine-slice template;
+    every page is then framed by stretching the template's straight middle
+    row and column, so painting chrome is a handful of blits whatever the
+    page size and no per-page frame pixmap is ever allocated.
+    """
+
+    def __init__(self, shadow_offset=3, radius=0, shadow_color=QColor(0, 0, 0, 40),
+                 paper_color=QColor("#ffffff"), border_color=QColor("#d5d9e0")):
+        self.shadow_offset = shadow_offset
+        self.radius = radius
+        self.shadow_color = shadow_color
+        self.paper_color = paper_color
+        self.border_color = border_color
+        self._template = None
+
+    @property
+    def extent(self):
+        """How far the chrome reaches past the bottom-right corner of the page."""
+        return self.shadow_offset
+
+    @property
+    def corner(self):
+        """Size of the template corners: everything that is not a straight edge."""
+        return self.radius + self.shadow_offset + 1
+
+    def paint(self, painter, rect):
+        corner = self.corner
+        if rect.width() <= 2 * corner or rect.height() <= 2 * corner:
+            self.draw(painter, rect)
+            return
+        template = self.template()
+        offset = self.shadow_offset
+        # (start, length) of the corner, edge and far corner slices
+        source = ((0, corner), (corner, 1), (corner + 1, corner + offset))
+        columns = (
+            (rect.x(), corner),
+            (rect.x() + corner, rect.width() - 2 * corner),
+            (rect.right() + 1 - corner, corner + offset),
+        )
+        rows = (
+            (rect.y(), corner),
+            (rect.y() + corner, rect.height() - 2 * corner),
+            (rect.bottom() + 1 - corner, corner + offset),
+        )
+        painter.save()
+        # Stretched slices are one pixel wide; filtering would bleed their neighbours in
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        for (sy, sh), (dy, dh) in zip(source, rows):
+            for (sx, sw), (dx, dw) in zip(source, columns):
+                painter.drawPixmap(QRect(dx, dy, dw, dh), template, QRect(sx, sy, sw, sh))
+        painter.restore()
+
+    def template(self):
+        if self._template is None:
+            size = 2 * self.corner + 1
+            self._template = QPixmap(size + self.shadow_offset, size + self.shadow_offset)
+            self._template.fill(Qt.transparent)
+            painter = QPainter(self._template)
+            self.draw(painter, QRect(0, 0, size, size))
+            painter.end()
+        return self._template
+
+    def draw(self, painter, rect):
+        painter.save()
+        if self.radius:
+            painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        if self.shadow_offset:
+            painter.setBrush(self.shadow_color)
+            offset = self.shadow_offset
+            painter.drawRoundedRect(rect.translated(offset, offset), self.radius, self.radius)
+        painter.setBrush(self.paper_color)
+        if self.border_color is not None:
+            painter.setPen(self.border_color)
+            rect = rect.adjusted(0, 0, -1, -1)
+        painter.drawRoundedRect(rect, self.radius, self.radius)
+        painter.restore()
+
+
+class PageItem:
+    """Everything the canvas paints for one page of the render window.
+
+    Items are plain objects; binding a page to the canvas costs a dict entry,
+    not a widget. A stand-in render (backdrop) is stretched to the page size,
+    the exact render and its tiles are drawn unscaled on top of it.
+    """
+
+    def __init__(self, canvas, page):
+        self.canvas = canvas
+        self.page = page
+        self.pixmap = None
+        self.backdrop = None
+        self.tiles = {}
+        # Search hits in page space; scaled at paint time so they follow zoom
+        self.highlights = ()
+        self.current_highlight = -1
+
+    @property
+    def sharp(self):
+        return self.pixmap is not None
+
+    def rescale(self):
+        """Keep showing the current render, stretched, while the page changes size."""
+        if self.pixmap is not None:
+            self.backdrop = self.pixmap
+            self.pixmap = None
+        self.tiles = {}
+        self.update()
+
+    def set_page_pixmap(self, pixmap):
+        self.backdrop = None
+        self.pixmap = pixmap
+        self.update()
+
+    def set_backdrop(self, pixmap):
+        self.backdrop = pixmap
+        self.update()
+
+    def set_highlights(self, rects, current=-1):
+        self.highlights = rects
+        self.current_highlight = current
+        self.update()
+
+    def set_tile(self, tile, pixmap):
+        self.tiles[tile] = pixmap
+        col, row = tile
+        self.update(QRect(col * TILE_SIZE, row * TILE_SIZE, pixmap.width(), pixmap.height()))
+
+    def update(self, rect=None):
+        self.canvas.update_page(self.page, rect)
+
+    def paint(self, painter, rect, scale):
+        if self.backdrop is not None:
+            painter.drawPixmap(rect, self.backdrop)
+        if self.pixmap is not None:
+            painter.drawPixmap(rect.topLeft(), self.pixmap)
+        for (col, row), pixmap in self.tiles.items():
+            painter.drawPixmap(rect.x() + col * TILE_SIZE, rect.y() + row * TILE_SIZE, pixmap)
+        for i, (x0, y0, x1, y1) in enumerate(self.highlights):
+            color = CURRENT_HIGHLIGHT_COLOR if i == self.current_highlight else HIGHLIGHT_COLOR
+            painter.fillRect(QRectF(
+                rect.x() + x0 * scale, rect.y() + y0 * scale, (x1 - x0) * scale, (y1 - y0) * scale
+            ), color)
+
+
+class PageCanvas(QAbstractScrollArea):
+    """Single widget that paints the pages in view straight from a PageGeometry.
+
+    Nothing is laid out: scrolling moves an offset and the next paint draws
+    whichever pages intersect the viewport, so scrolling and repainting cost
+    the same for ten pages or ten thousand. Pages with a bound PageItem show
+    their renders, every other page is drawn as blank paper.
+    """
+
+    resized = pyqtSignal()
+
+    def __init__(self, parent=None, margin=12, chrome=None, background=QColor("#f7f8fa")):
+        super().__init__(parent)
+        self.page_geometry = None
+        self.page_margin = margin
+        self.chrome = chrome or PageChrome()
+        self.background = background
+        self.items = {}
+        self.verticalScrollBar().setSingleStep(SCROLL_STEP)
+        self.horizontalScrollBar().setSingleStep(SCROLL_STEP)
+
+    # ----- Scene -----
+    def set_page_geometry(self, geometry):
+        self.page_geometry = geometry
+        self.relayout()
+
+    def relayout(self):
+        """Refresh scroll ranges after the geometry changed (new document or scale)."""
+        viewport = self.viewport()
+        height = self.page_geometry.total_height if self.page_geometry else 0
+        vbar, hbar = self.verticalScrollBar(), self.horizontalScrollBar()
+        vbar.setRange(0, max(0, height - viewport.height()))
+        vbar.setPageStep(viewport.height())
+        hbar.setRange(0, max(0, self.content_width() - viewport.width()))
+        hbar.setPageStep(viewport.width())
+        viewport.update()
+
+    def content_width(self):
+        if not self.page_geometry:
+            return 0
+        return self.page_geometry.max_width + 2 * self.page_margin + self.chrome.extent
+
+    def page_x(self, page):
+        """Pages are centred in the wider of the viewport and the widest page."""
+        width = max(self.content_width(), self.viewport().width())
+        return max(self.page_margin, (width - self.page_geometry.page_width(page)) // 2)
+
+    def page_rect(self, page):
+        """Rectangle of a page in document coordinates."""
+        geometry = self.page_geometry
+        return QRect(self.page_x(page), geometry.page_top(page), geometry.page_width(page), geometry.page_height(page))
+
+    def view_rect(self):
+        """Part of the document currently in the viewport, in document coordinates."""
+        viewport = self.viewport()
+        return QRect(self.horizontalScrollBar().value(), self.verticalScrollBar().value(),
+                     viewport.width(), viewport.height())
+
+    def scroll_to(self, x=None, y=None):
+        if x is not None:
+            self.horizontalScrollBar().setValue(int(x))
+        if y is not None:
+            self.verticalScrollBar().setValue(int(y))
+
+    # ----- Items -----
+    def item(self, page):
+        return self.items.get(page)
+
+    def bind(self, page):
+        item = self.items.get(page)
+        if item is None:
+            item = self.items[page] = PageItem(self, page)
+            self.update_page(page)
+        return item
+
+    def release(self, page):
+        if self.items.pop(page, None) is not None:
+            self.update_page(page)
+
+    def clear_items(self):
+        self.items = {}
+        self.viewport().update()
+
+    def update_page(self, page, rect=None):
+        """Repaint a page, or a rectangle of it in page pixels, if it is on screen."""
+        if self.page_geometry is None or not 0 <= page < len(self.page_geometry):
+            return
+        area = self.page_rect(page)
+        if rect is None:
+            area.adjust(0, 0, self.chrome.extent, self.chrome.extent)
+        else:
+            area = rect.translated(area.topLeft()).intersected(area)
+        view = self.view_rect()
+        area.translate(-view.x(), -view.y())
+        if area.intersects(self.viewport().rect()):
+            self.viewport().update(area)
+
+    # ----- Qt -----
+    def scrollContentsBy(self, dx, dy):
+        # Blit what is still visible; only the exposed strip gets painted
+        self.viewport().scroll(dx, dy)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.relayout()
+        self.resized.emit()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.background)
+        geometry = self.page_geometry
+        if geometry is None or not len(geometry):
+            painter.end()
+            return
+        view = self.view_rect()
+        dirty = event.rect().translated(view.topLeft())
+        painter.translate(-view.x(), -view.y())
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        extent = self.chrome.extent
+        first, end = geometry.visible_range(dirty.top() - extent, dirty.bottom() + 1)
+        for page in range(first, min(end, len(geometry))):
+            rect = self.page_rect(page)
+            if not rect.adjusted(0, 0, extent, extent).intersects(dirty):
+                continue
+            self.chrome.paint(painter, rect)
+            item = self.items.get(page)
+            if item is not None:
+                item.paint(painter, rect, geometry.scale)
+        painter.end()
@@ -0,0 +1,76 @@
+from bisect import bisect_right
+
+from features.fitz_lock import FITZ_LOCK
+
+
+class PageGeometry:
+    """Prefix-sum index of page positions in the scrolled document.
+
+    Page sizes are read once (in PDF points); offsets are rebuilt whenever the
+    scale changes. Offset -> page lookups are a binary search, so position
+    tracking stays O(log n) however long the document is.
+    """
+
+    def __init__(self, page_sizes, scale=1.0, spacing=24, margin=0):
+        self.page_sizes = list(page_sizes)
+        self.spacing = spacing
+        self.margin = margin
+        self.offsets = []
+        self.heights = []
+        self.widths = []
+        self.total_height = 0
+        self.max_width = 0
+        self.set_scale(scale)
+
+    @classmethod
+    def from_document(cls, doc, **kwargs):
+        sizes = []
+        with FITZ_LOCK:
+            for i in range(len(doc)):
+                rect = doc.load_page(i).rect
+                sizes.append((rect.width, rect.height))
+        return cls(sizes, **kwargs)
+
+    def __len__(self):
+        return len(self.page_sizes)
+
+    def set_scale(self, scale):
+        self.scale = scale
+        self.offsets = []
+        self.heights = []
+        self.widths = []
+        y = self.margin
+        for width, height in self.page_sizes:
+            self.offsets.append(y)
+            self.widths.append(int(round(width * scale)))
+            self.heights.append(int(round(height * scale)))
+            y += self.heights[-1] + self.spacing
+        if self.page_sizes:
+            y -= self.spacing
+        self.total_height = y + self.margin
+        self.max_width = max(self.widths, default=0)
+
+    def page_top(self, page):
+        return self.offsets[page]
+
+    def page_bottom(self, page):
+        return self.offsets[page] + self.heights[page]
+
+    def page_height(self, page):
+        return self.heights[page]
+
+    def page_width(self, page):
+        return self.widths[page]
+
+    def page_at(self, y):
+        """Page under document offset y; the gap after a page belongs to that page."""
+        if not self.offsets:
+            return 0
+        page = bisect_right(self.offsets, y) - 1
+        return max(0, min(page, len(self.offsets) - 1))
+
+    def visible_range(self, top, bottom):
+        """Half-open range of pages intersecting [top, bottom)."""
+        if not self.offsets:
+            return 0, 0
+        return self.page_at(top), self.page_at(bottom) + 1
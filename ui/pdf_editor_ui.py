@@ -120,6 +120,8 @@ from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QLabel, QVBo
 from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QColor
 from PyQt5.QtCore import Qt, QPoint
 
+from features.fitz_lock import FITZ_LOCK
+
 class PdfEditorWidget(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -157,13 +159,14 @@ class PdfEditorWidget(QMainWindow):
     def open_pdf(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open PDF", "", "PDF Files (*.pdf)")
         if file_path:
-            self.pdf_file = fitz.open(file_path)
+            with FITZ_LOCK:
+                self.pdf_file = fitz.open(file_path)
             self.page_number = 0
             self.show_page()
 
     def show_page(self):
-        page = self.pdf_file[self.page_number]
-        image = page.get_pixmap()
+        with FITZ_LOCK:
+            image = self.pdf_file[self.page_number].get_pixmap()
         qimage = QImage(image.samples, image.width, image.height, QImage.Format_RGB888)
         self.pixmap = QPixmap.fromImage(qimage)
         self.label.setPixmap(self.pixmap)
@@ -183,17 +186,29 @@ class PdfEditorWidget(QMainWindow):
             painter.end()
             self.label.repaint()
 
+    def has_unsaved(self):
+        return bool(self.annotations)
+
+    def close_tool(self):
+        if self.pdf_file is not None:
+            with FITZ_LOCK:
+                self.pdf_file.close()
+            self.pdf_file = None
+
     def save_pdf(self):
         if not self.pdf_file or not self.annotations:
             QMessageBox.warning(self, "Nothing To Save", "No edits to save.")
             return
         # Apply all text annotations to PDF using PyMuPDF
-        for text, pos in self.annotations:
-            page = self.pdf_file[self.page_number]
-            page.insert_text(pos, text, fontsize=14, color=(1,0,0))
+        with FITZ_LOCK:
+            for text, pos in self.annotations:
+                page = self.pdf_file[self.page_number]
+                page.insert_text(pos, text, fontsize=14, color=(1,0,0))
         save_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", "edited.pdf", "PDF Files (*.pdf)")
         if save_path:
-            self.pdf_file.save(save_path)
+            with FITZ_LOCK:
+                self.pdf_file.save(save_path)
+            self.annotations.clear()
             QMessageBox.information(self, "Saved", f"Edited PDF saved to: {save_path}")
 
 if __name__ == "__main__":
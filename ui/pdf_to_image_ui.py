@@ -7,6 +7,9 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
+
 class PDFToJPGWidget(QWidget):
     def __init__(self):
         super().__init__()
@@ -84,37 +87,37 @@ class PDFToJPGWidget(QWidget):
             QMessageBox.warning(self, "Missing", "Please select PDF(s) and an output folder.")
             return
 
+        # Counting pages leaves the documents open in the pool for the render pass
         total_pages = 0
         for pdf_path in self.pdf_files:
-            pdf_document = fitz.open(pdf_path)
-            total_pages += len(pdf_document)
-            pdf_document.close()
+            with document_pool().open(pdf_path) as pdf_document:
+                total_pages += len(pdf_document)
 
         done_pages = 0
         self.progress_bar.setValue(0)
 
         try:
             for pdf_path in self.pdf_files:
-                pdf_document = fitz.open(pdf_path)
-                pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
-                pdf_output_folder = os.path.join(self.output_folder, pdf_name)
-                os.makedirs(pdf_output_folder, exist_ok=True)
-
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document.load_page(page_num)
-                    pix = page.get_pixmap(matrix=fitz.Matrix(1.25, 1.25))  # Good quality, adjust as needed
-                    img_mode = "RGB" if pix.n < 5 else "RGBA"
-                    image = Image.frombytes(img_mode, [pix.width, pix.height], pix.samples)
-                    output_file = os.path.join(pdf_output_folder, f"{pdf_name}_page_{page_num + 1}.jpeg")
-                    image = image.convert("RGB")
-                    image.save(output_file, "JPEG", quality=85, optimize=True)
-
-                    done_pages += 1
-                    progress = int(100 * done_pages / total_pages)
-                    self.progress_bar.setValue(progress)
-                    QApplication.processEvents()  # Force UI update
-
-                pdf_document.close()
+                with document_pool().open(pdf_path) as pdf_document:
+                    pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
+                    pdf_output_folder = os.path.join(self.output_folder, pdf_name)
+                    os.makedirs(pdf_output_folder, exist_ok=True)
+
+                    for page_num in range(len(pdf_document)):
+                        with FITZ_LOCK:
+                            page = pdf_document.load_page(page_num)
+                            pix = page.get_pixmap(matrix=fitz.Matrix(1.25, 1.25))  # Good quality, adjust as needed
+                        img_mode = "RGB" if pix.n < 5 else "RGBA"
+                        image = Image.frombytes(img_mode, [pix.width, pix.height], pix.samples)
+                        output_file = os.path.join(pdf_output_folder, f"{pdf_name}_page_{page_num + 1}.jpeg")
+                        image = image.convert("RGB")
+                        image.save(output_file, "JPEG", quality=85, optimize=True)
+
+                        done_pages += 1
+                        progress = int(100 * done_pages / total_pages)
+                        self.progress_bar.setValue(progress)
+                        QApplication.processEvents()  # Force UI update
+
             self.progress_bar.setValue(100)
             QMessageBox.information(self, "Success", "Conversion completed successfully!")
         except Exception as e:
@@ -7,6 +7,10 @@ from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from pdf2docx import Converter
 
+from features.thumbnail_cache import shared_thumbnail_cache, scale_variant
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
+
 # Conversion logic in a QThread for UI responsiveness
 class PDFToWordWorker(QThread):
     progress = pyqtSignal(int)
@@ -22,11 +26,13 @@ class PDFToWordWorker(QThread):
         try:
            
             self.progress.emit(10)
-            cv = Converter(self.pdf_path)
-            self.progress.emit(30)
-            cv.convert(self.word_path, start=0, end=None)
+            # pdf2docx drives fitz itself, so the whole conversion holds the lock
+            with FITZ_LOCK:
+                cv = Converter(self.pdf_path)
+                self.progress.emit(30)
+                cv.convert(self.word_path, start=0, end=None)
+                cv.close()
             self.progress.emit(100)
-            cv.close()
             self.finished.emit(self.word_path)
         except Exception as e:
             self.error.emit(str(e))
@@ -99,14 +105,18 @@ class PDFToWordWidget(QWidget):
         self.pdf_path = file
         # Preview first page
         try:
-            doc = fitz.open(file)
-            page = doc.load_page(0)
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.5, 0.5))
-            fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
-            qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
-            pixmap = QPixmap.fromImage(qimg)
+            cache = shared_thumbnail_cache()
+            variant = scale_variant(0.5)
+            pixmap = QPixmap()
+            data = cache.get(file, 0, variant)
+            if data is None or not pixmap.loadFromData(data):
+                with document_pool().open(file) as doc, FITZ_LOCK:
+                    pix = doc.load_page(0).get_pixmap(matrix=fitz.Matrix(0.5, 0.5))
+                cache.put(file, 0, variant, pix.tobytes("png"))
+                fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
+                qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
+                pixmap = QPixmap.fromImage(qimg)
             self.pdf_preview.setPixmap(pixmap)
-            doc.close()
         except Exception:
             self.pdf_preview.setText("Cannot preview PDF.")
         self.convert_btn.setEnabled(True)
@@ -128,6 +138,10 @@ class PDFToWordWidget(QWidget):
         self.worker.error.connect(self.conversion_error)
         self.worker.start()
 
+    def is_busy(self):
+        """Keeps the tool registry from closing the tool mid-conversion."""
+        return self.worker is not None and self.worker.isRunning()
+
     def conversion_done(self, output_file):
         self.progress.setVisible(False)
         self.open_btn.setVisible(True)
@@ -6,6 +6,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import Qt, QSize
 
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
+
 class PDFPageWidget(QWidget):
     def __init__(self, pdf_path, page_num, scale=1.0):
         super().__init__()
@@ -24,16 +27,16 @@ class PDFPageWidget(QWidget):
         self.render_page()
 
     def render_page(self):
-        doc = fitz.open(self.pdf_path)
-        page = doc.load_page(self.page_num)
-        mat = fitz.Matrix(self.scale, self.scale)
-        pix = page.get_pixmap(matrix=mat)
+        # Every page widget shares the viewer's pooled document
+        with document_pool().open(self.pdf_path) as doc, FITZ_LOCK:
+            page = doc.load_page(self.page_num)
+            mat = fitz.Matrix(self.scale, self.scale)
+            pix = page.get_pixmap(matrix=mat)
         fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
         qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
         pixmap = QPixmap.fromImage(qimg)
         pixmap = pixmap.scaledToHeight(800, Qt.SmoothTransformation)
         self.image_label.setPixmap(pixmap)
-        doc.close()
 
 class PDFViewerWidget(QWidget):
     def __init__(self):
@@ -42,6 +45,7 @@ class PDFViewerWidget(QWidget):
         self.setMinimumSize(1000, 700)
         self.pdf_path = None
         self.doc = None
+        self.doc_handle = None
         self.scale = 1.0
         self.init_ui()
 
@@ -67,8 +71,11 @@ class PDFViewerWidget(QWidget):
         self.open_pdf_from_path(file_path)
 
     def open_pdf_from_path(self, pdf_path):
+        if self.doc_handle is not None:
+            self.doc_handle.release()
         self.pdf_path = pdf_path
-        self.doc = fitz.open(self.pdf_path)
+        self.doc_handle = document_pool().acquire(self.pdf_path)
+        self.doc = self.doc_handle.doc
         self.populate_pages()
 
     def populate_pages(self):
@@ -0,0 +1,123 @@
+import os
+from collections import OrderedDict
+
+DEFAULT_BUDGET_MB = 256
+
+_shared_cache = None
+
+
+def document_identity(path):
+    """Identity of a file on disk; changes whenever the file is rewritten."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """LRU cache of rendered pages keyed by (document, page, scale), bounded in megabytes."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._scales = {}
+
+    @staticmethod
+    def make_key(doc_id, page, scale, tile=None):
+        return (doc_id, page, round(scale, 4), tile)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, doc_id, page, scale, tile=None):
+        key = self.make_key(doc_id, page, scale, tile)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def nearest(self, doc_id, page, scale, max_ratio=2.0):
+        """Closest cached render of the page, for scaling up or down until the exact one arrives."""
+        best_key, best_ratio = None, max_ratio
+        for cached_scale in self._scales.get((doc_id, page), ()):
+            ratio = max(scale, cached_scale) / min(scale, cached_scale)
+            if ratio <= best_ratio:
+                best_key, best_ratio = (doc_id, page, cached_scale, None), ratio
+        if best_key is None:
+            return None, None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][0], best_key[2]
+
+    def put(self, doc_id, page, scale, pixmap, tile=None):
+        key = self.make_key(doc_id, page, scale, tile)
+        self._remove(key)
+        size = pixmap_bytes(pixmap)
+        if size > self.budget_bytes:
+            return
+        self._entries[key] = (pixmap, size)
+        if tile is None:
+            # Only whole-page renders are candidates for nearest()
+            self._scales.setdefault((doc_id, page), set()).add(key[2])
+        self.used_bytes += size
+        self._evict()
+
+    def set_budget(self, budget_mb):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._evict()
+
+    def evict_document(self, doc_id):
+        for key in [k for k in self._entries if k[0] == doc_id]:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._scales.clear()
+        self.used_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "used_mb": self.used_bytes / (1024 * 1024),
+            "budget_mb": self.budget_bytes / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.used_bytes -= entry[1]
+        scales = self._scales.get(key[:2])
+        if scales is not None and key[3] is None:
+            scales.discard(key[2])
+            if not scales:
+                del self._scales[key[:2]]
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+def shared_pixmap_cache():
+    """One render budget for every open document in the process."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PixmapCache()
+    return _shared_cache
@@ -0,0 +1,89 @@
+import time
+from collections import deque
+
+
+class ScrollPrefetcher:
+    """Decides which pages to render around the viewport from how the user is scrolling.
+
+    At rest it keeps `window` pages on either side. While scrolling it looks
+    further ahead in the direction of travel, drops pages the viewport will
+    have passed before their render could finish, and asks for drafts only
+    during flings.
+    """
+
+    def __init__(self, window=2, max_ahead=10, fling_speed=4000, lookahead_seconds=0.6, sample_seconds=0.25):
+        self.window = window
+        self.max_ahead = max_ahead
+        self.fling_speed = fling_speed
+        self.lookahead_seconds = lookahead_seconds
+        self.sample_seconds = sample_seconds
+        # Moving average of how long one full page render takes
+        self.render_seconds = 0.08
+        self._samples = deque()
+
+    def record_scroll(self, offset, now=None):
+        now = time.monotonic() if now is None else now
+        self._samples.append((now, offset))
+        while self._samples and now - self._samples[0][0] > self.sample_seconds:
+            self._samples.popleft()
+
+    def record_render(self, seconds):
+        self.render_seconds = 0.8 * self.render_seconds + 0.2 * seconds
+
+    def reset(self):
+        self._samples.clear()
+
+    def velocity(self, now=None):
+        """Scroll speed in pixels per second; positive when moving down."""
+        now = time.monotonic() if now is None else now
+        if len(self._samples) < 2 or now - self._samples[-1][0] > self.sample_seconds:
+            return 0.0
+        (t0, y0), (t1, y1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return (y1 - y0) / (t1 - t0)
+
+    def is_fling(self, now=None):
+        return abs(self.velocity(now)) >= self.fling_speed
+
+    def plan(self, geometry, top, viewport_height, now=None):
+        """Pages to render, most urgent first, and whether only drafts are worth asking for."""
+        total = len(geometry)
+        if total == 0:
+            return [], False
+        velocity = self.velocity(now)
+        first, end = geometry.visible_range(top, top + viewport_height)
+        visible = list(range(first, min(end, total)))
+
+        if velocity == 0:
+            ahead = list(range(visible[-1] + 1, min(total, visible[-1] + 1 + self.window)))
+            behind = list(range(first - 1, max(-1, first - 1 - self.window), -1))
+            return visible + ahead + behind, False
+
+        direction = 1 if velocity > 0 else -1
+        average_height = max(1, geometry.total_height / total)
+        extra = int(abs(velocity) * self.lookahead_seconds / average_height)
+        count = min(self.max_ahead, self.window + extra)
+        if direction > 0:
+            visible_order = visible
+            ahead = range(visible[-1] + 1, min(total, visible[-1] + 1 + count))
+            behind = range(first - 1, max(-1, first - 2), -1)
+        else:
+            visible_order = visible[::-1]
+            ahead = range(first - 1, max(-1, first - 1 - count), -1)
+            behind = range(visible[-1] + 1, min(total, visible[-1] + 2))
+
+        # Skip pages the viewport will already have left when their render finishes
+        pages = []
+        for page in list(visible_order) + list(ahead):
+            finish = (len(pages) + 1) * self.render_seconds
+            future_top = top + velocity * finish
+            if direction > 0 and geometry.page_bottom(page) < future_top:
+                continue
+            if direction < 0 and geometry.page_top(page) > future_top + viewport_height:
+                continue
+            pages.append(page)
+        fling = abs(velocity) >= self.fling_speed
+        if not fling:
+            pages.extend(behind)
+        return pages, fling
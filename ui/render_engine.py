@@ -0,0 +1,280 @@
+import itertools
+import time
+
+import fitz
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from features.thumbnail_cache import shared_thumbnail_cache, scale_variant, size_variant
+from features.display_list_cache import shared_display_list_cache
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
+
+TILE_SIZE = 512
+# Drafts render at a fraction of the final scale and jump the queue
+DRAFT_FACTOR = 0.25
+DRAFT_PRIORITY = 10
+# Disk cache variant holding a file's page count, stored beside its thumbnails
+PAGE_COUNT_VARIANT = "pages"
+
+_request_ids = itertools.count(1)
+_pool = None
+
+
+def render_pool():
+    """The render thread shared by every render engine in the process.
+
+    PyMuPDF does not support multithreading (see features/fitz_lock), so
+    renders run one at a time on a single long-lived thread, each under
+    FITZ_LOCK; more threads would only queue on the lock. Keeping the thread
+    alive also keeps its pooled documents and display lists usable.
+    """
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(1)
+        _pool.setExpiryTimeout(-1)
+    return _pool
+
+
+def draft_scale(scale):
+    return scale * DRAFT_FACTOR
+
+
+def cached_page_count(path):
+    """Pages in a file, kept in the thumbnail disk cache so later sessions need not open it."""
+    cache = shared_thumbnail_cache()
+    data = cache.get(path, 0, PAGE_COUNT_VARIANT)
+    if data is not None and data.isdigit():
+        return int(data)
+    with document_pool().open(path) as doc:
+        count = len(doc)
+    cache.put(path, 0, PAGE_COUNT_VARIANT, str(count).encode())
+    return count
+
+
+def pixmap_to_qimage(pix):
+    fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
+    # copy() detaches the image from pix.samples, which dies with the pixmap
+    return QImage(pix.samples, pix.width, pix.height, pix.stride, fmt).copy()
+
+
+class RenderRequest:
+    def __init__(self, path, page, scale, generation, priority=0, use_disk_cache=False, tile=None,
+                 draft=False):
+        self.id = next(_request_ids)
+        self.path = path
+        self.page = page
+        self.scale = scale
+        self.generation = generation
+        self.priority = priority
+        self.use_disk_cache = use_disk_cache
+        # (column, row) of a TILE_SIZE square in page pixels, or None for the whole page
+        self.tile = tile
+        # Drafts are quick low-scale stand-ins, upscaled until the full render lands
+        self.draft = draft
+        self.cancelled = False
+        self.render_seconds = None
+
+    @property
+    def key(self):
+        return (self.path, self.page, round(self.scale, 4), self.tile, self.draft)
+
+    def render(self):
+        if self.use_disk_cache:
+            return self._render_cached()
+        return pixmap_to_qimage(self._pixmap())
+
+    def _pixmap(self):
+        # Worker threads each get their own pooled copy of the document
+        with document_pool().open(self.path) as doc:
+            return self._render_page(doc.load_page(self.page))
+
+    def _render_page(self, page):
+        mat = fitz.Matrix(self.scale, self.scale)
+        clip = None
+        if self.tile is not None:
+            # Clip rectangles are in page space, tiles are in rendered pixels
+            rect = page.rect
+            step = TILE_SIZE / self.scale
+            col, row = self.tile
+            clip = fitz.Rect(
+                rect.x0 + col * step, rect.y0 + row * step,
+                rect.x0 + (col + 1) * step, rect.y0 + (row + 1) * step,
+            ).intersect(rect)
+        # Repeat renders of a page (new zoom, draft then full, tiles) reuse its display list
+        return shared_display_list_cache().render(page, mat, clip=clip)
+
+    def _render_cached(self):
+        cache = shared_thumbnail_cache()
+        variant = scale_variant(self.scale)
+        data = cache.get(self.path, self.page, variant)
+        if data is not None:
+            image = QImage.fromData(data)
+            if not image.isNull():
+                return image
+        pix = self._pixmap()
+        cache.put(self.path, self.page, variant, pix.tobytes("png"))
+        return pixmap_to_qimage(pix)
+
+
+class ThumbnailRequest(RenderRequest):
+    """A page rendered to fit inside width x height, cached on disk under that size unless use_disk_cache is off."""
+
+    def __init__(self, path, page, width, height, generation, priority=0, use_disk_cache=True):
+        super().__init__(path, page, 0, generation, priority, use_disk_cache=use_disk_cache)
+        self.width = width
+        self.height = height
+        # Filled in for first pages, so lists of files learn how long each one is
+        self.page_count = None
+
+    @property
+    def key(self):
+        return (self.path, self.page, size_variant(self.width, self.height))
+
+    def render(self):
+        if self.page == 0 and self.use_disk_cache:
+            self.page_count = cached_page_count(self.path)
+        cache = shared_thumbnail_cache()
+        variant = size_variant(self.width, self.height)
+        data = cache.get(self.path, self.page, variant) if self.use_disk_cache else None
+        if data is not None:
+            image = QImage.fromData(data)
+            if not image.isNull():
+                return image
+        with document_pool().open(self.path) as doc:
+            page = doc.load_page(self.page)
+            self.scale = min(self.width / page.rect.width, self.height / page.rect.height)
+            # One-off render: not worth a display list
+            pix = page.get_pixmap(matrix=fitz.Matrix(self.scale, self.scale), alpha=False)
+        if self.use_disk_cache:
+            cache.put(self.path, self.page, variant, pix.tobytes("png"))
+        return pixmap_to_qimage(pix)
+
+
+class PageCountRequest(RenderRequest):
+    """Counts a file's pages without rendering any; render() returns a null image."""
+
+    def __init__(self, path, generation, priority=0):
+        super().__init__(path, 0, 0, generation, priority)
+        self.page_count = None
+
+    @property
+    def key(self):
+        return (self.path, PAGE_COUNT_VARIANT)
+
+    def render(self):
+        self.page_count = cached_page_count(self.path)
+        return QImage()
+
+
+class _RenderSignals(QObject):
+    done = pyqtSignal(object, object, str)
+
+
+class _RenderTask(QRunnable):
+    def __init__(self, engine, request):
+        super().__init__()
+        self.engine = engine
+        self.request = request
+        self.signals = engine._signals
+
+    def run(self):
+        request = self.request
+        if not self.engine.is_current(request):
+            self.signals.done.emit(request, None, "")
+            return
+        try:
+            started = time.perf_counter()
+            with FITZ_LOCK:
+                image = request.render()
+            request.render_seconds = time.perf_counter() - started
+        except Exception as e:
+            self.signals.done.emit(request, None, str(e))
+            return
+        self.signals.done.emit(request, image, "")
+
+
+class PageRenderEngine(QObject):
+    """Renders pages on the shared worker pool and posts QImages back to the GUI thread.
+
+    Every request carries the engine generation it was made in. Bumping the
+    generation (new document, new zoom) drops everything still queued or in
+    flight; single requests can be cancelled when they scroll out of range.
+    """
+
+    page_ready = pyqtSignal(object, QImage)
+    render_failed = pyqtSignal(object, str)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or render_pool()
+        self.generation = 0
+        self._tasks = {}
+        self._pending = {}
+        self._signals = _RenderSignals()
+        self._signals.done.connect(self._on_done)
+
+    def new_generation(self):
+        self.generation += 1
+        self.cancel_all()
+        return self.generation
+
+    def is_current(self, request):
+        return not request.cancelled and request.generation == self.generation
+
+    def request(self, path, page, scale, priority=0, use_disk_cache=False, tile=None):
+        return self.submit(RenderRequest(path, page, scale, self.generation, priority, use_disk_cache, tile))
+
+    def request_draft(self, path, page, scale):
+        """Low-scale render of a page that will be shown at `scale`."""
+        return self.submit(RenderRequest(
+            path, page, draft_scale(scale), self.generation, DRAFT_PRIORITY, draft=True
+        ))
+
+    def request_thumbnail(self, path, page, width, height, priority=0, use_disk_cache=True):
+        """Render a page scaled to fit inside width x height."""
+        return self.submit(ThumbnailRequest(path, page, width, height, self.generation, priority, use_disk_cache))
+
+    def request_page_count(self, path, priority=0):
+        """Count a file's pages; page_ready carries a null image and request.page_count."""
+        return self.submit(PageCountRequest(path, self.generation, priority))
+
+    def submit(self, request):
+        pending = self._pending.get(request.key)
+        if pending is not None and self.is_current(pending):
+            return pending
+        task = _RenderTask(self, request)
+        self._tasks[request.id] = task
+        self._pending[request.key] = request
+        self.pool.start(task, request.priority)
+        return request
+
+    def cancel(self, request):
+        if request is None or request.cancelled:
+            return
+        request.cancelled = True
+        task = self._tasks.get(request.id)
+        if task is not None and self.pool.tryTake(task):
+            self._forget(request)
+
+    def cancel_all(self):
+        for task in list(self._tasks.values()):
+            self.cancel(task.request)
+
+    def pending_requests(self):
+        return [task.request for task in self._tasks.values() if self.is_current(task.request)]
+
+    def _forget(self, request):
+        self._tasks.pop(request.id, None)
+        if self._pending.get(request.key) is request:
+            del self._pending[request.key]
+
+    def _on_done(self, request, image, error):
+        self._forget(request)
+        if not self.is_current(request):
+            return
+        if error:
+            self.render_failed.emit(request, error)
+        elif image is not None:
+            self.page_ready.emit(request, image)
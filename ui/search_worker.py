@@ -0,0 +1,86 @@
+import fitz
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from features.fitz_lock import FITZ_LOCK
+from features.search_index import SearchIndex, search_page
+
+
+class IndexBuildWorker(QThread):
+    """Loads the persisted index for a document, or extracts page text to build it."""
+    loaded = pyqtSignal(object)
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(object)
+
+    def __init__(self, pdf_path, page_count):
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.page_count = page_count
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            index = SearchIndex.load(self.pdf_path, self.page_count)
+            # Searches can start on the partial index straight away
+            self.loaded.emit(index)
+            if not index.complete:
+                with FITZ_LOCK:
+                    doc = fitz.open(self.pdf_path)
+                try:
+                    finished = index.build(doc, should_stop=lambda: self._stop, progress=self.progress.emit)
+                finally:
+                    with FITZ_LOCK:
+                        doc.close()
+                if not finished:
+                    return
+                index.save()
+            self.completed.emit(index)
+        except Exception as e:
+            print(f"Search index error: {e}")
+
+
+class SearchWorker(QThread):
+    """Runs one query, streaming each page's hit rectangles as soon as they are found."""
+    hits_found = pyqtSignal(int, list)
+    finished_search = pyqtSignal(str, int)
+
+    def __init__(self, pdf_path, index, query):
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.index = index
+        self.query = query
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        cached = self.index.cached_results(self.query)
+        if cached is not None:
+            for page_num, rects in cached:
+                self.hits_found.emit(page_num, rects)
+            self.finished_search.emit(self.query, len(cached))
+            return
+
+        hits = []
+        with FITZ_LOCK:
+            doc = fitz.open(self.pdf_path)
+        try:
+            for page_num in self.index.candidate_pages(self.query):
+                if self._stop:
+                    return
+                with FITZ_LOCK:
+                    rects = search_page(doc.load_page(page_num), self.query)
+                if rects:
+                    hits.append((page_num, rects))
+                    self.hits_found.emit(page_num, rects)
+        except Exception as e:
+            print(f"Search error: {e}")
+            return
+        finally:
+            with FITZ_LOCK:
+                doc.close()
+        self.index.store_results(self.query, hits)
+        self.finished_search.emit(self.query, len(hits))
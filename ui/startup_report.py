@@ -0,0 +1,82 @@
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Set to any value to print the report once the window is up
+REPORT_ENV = "PDF_HERO_STARTUP_REPORT"
+
+_start = time.perf_counter()
+_marks = []
+_imports = []
+
+
+def begin(started):
+    """Measure from `started` (a perf_counter value) instead of from this module's import."""
+    global _start
+    _start = started
+
+
+def elapsed():
+    return time.perf_counter() - _start
+
+
+def mark(label):
+    """Record a point on the startup timeline."""
+    _marks.append((label, elapsed()))
+
+
+@contextmanager
+def timed(label):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _imports.append((label, time.perf_counter() - started))
+
+
+def timed_import(module_name):
+    """Import a module, recording what the import cost if it was not loaded yet."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with timed(module_name):
+        return importlib.import_module(module_name)
+
+
+def load_object(target):
+    """Resolve a lazy "package.module:attribute" reference."""
+    module_name, _, attribute = target.partition(":")
+    module = timed_import(module_name)
+    return getattr(module, attribute) if attribute else module
+
+
+def record(name, seconds):
+    """Append a measurement to the startup log in the cache directory, to track regressions."""
+    from features.thumbnail_cache import default_cache_dir
+
+    log_path = os.path.join(default_cache_dir(), "startup_times.csv")
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, "a") as f:
+            f.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S')},{name},{seconds * 1000:.1f}\n")
+    except OSError as e:
+        print(f"Could not record startup time: {e}")
+
+
+def enabled():
+    return bool(os.environ.get(REPORT_ENV))
+
+
+def report():
+    lines = ["Startup timeline:"]
+    lines += [f"  {seconds * 1000:8.1f} ms  {label}" for label, seconds in _marks]
+    lines.append("Imports (slowest first, nested imports included):")
+    lines += [f"  {seconds * 1000:8.1f} ms  {label}" for label, seconds in sorted(_imports, key=lambda i: -i[1])]
+    return "\n".join(lines)
+
+
+def print_report():
+    if enabled():
+        print(report())
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+from PyQt5.QtGui import QPixmap, QColor, QPainter, QIcon
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QTimer
+
+from ui.render_engine import PageRenderEngine
+
+# Thumbnails queue behind the main page renders on the shared pool
+THUMBNAIL_PRIORITY = -10
+THUMBNAIL_SCALE = 0.10
+MAX_CACHED_THUMBNAILS = 1500
+
+
+def placeholder_pixmap(size):
+    pixmap = QPixmap(size)
+    pixmap.fill(QColor("#ffffff"))
+    painter = QPainter(pixmap)
+    painter.setPen(QColor("#d5dae3"))
+    painter.drawRect(0, 0, size.width() - 1, size.height() - 1)
+    painter.end()
+    return pixmap
+
+
+class PageThumbnailModel(QAbstractListModel):
+    """One row per page; icons are rendered on demand and shown as placeholders until then."""
+
+    def __init__(self, parent=None, scale=THUMBNAIL_SCALE):
+        super().__init__(parent)
+        self.scale = scale
+        self.path = None
+        self.page_count = 0
+        self.thumbnails = OrderedDict()
+        self.requests = {}
+        self.placeholder = QIcon()
+        self.engine = PageRenderEngine(self)
+        self.engine.page_ready.connect(self.on_thumbnail_rendered)
+
+    def set_document(self, path, page_count, page_size=None):
+        self.beginResetModel()
+        self.engine.new_generation()
+        self.requests.clear()
+        self.thumbnails.clear()
+        self.path = path
+        self.page_count = page_count
+        if page_size is not None:
+            width, height = page_size
+            size = QSize(max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+            self.placeholder = QIcon(placeholder_pixmap(size))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.page_count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return str(row + 1)
+        if role == Qt.DecorationRole:
+            return self.thumbnails.get(row, self.placeholder)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def request_rows(self, first, last):
+        """Render thumbnails for rows [first, last] and drop queued work for everything else."""
+        for row, request in list(self.requests.items()):
+            if not first <= row <= last:
+                self.engine.cancel(request)
+                del self.requests[row]
+        for row in range(max(0, first), min(self.page_count - 1, last) + 1):
+            if row in self.thumbnails:
+                self.thumbnails.move_to_end(row)
+            elif row not in self.requests:
+                self.requests[row] = self.engine.request(
+                    self.path, row, self.scale, THUMBNAIL_PRIORITY, use_disk_cache=True
+                )
+
+    def memory_usage(self):
+        size = self.placeholder.availableSizes()
+        if not size:
+            return 0
+        return len(self.thumbnails) * size[0].width() * size[0].height() * 4
+
+    def trim(self, keep):
+        """Keep only the `keep` most recently used thumbnails and drop queued renders."""
+        self.engine.cancel_all()
+        self.requests.clear()
+        while len(self.thumbnails) > keep:
+            self.thumbnails.popitem(last=False)
+
+    def on_thumbnail_rendered(self, request, image):
+        self.requests.pop(request.page, None)
+        if request.path != self.path:
+            return
+        self.thumbnails[request.page] = QIcon(QPixmap.fromImage(image))
+        while len(self.thumbnails) > MAX_CACHED_THUMBNAILS:
+            self.thumbnails.popitem(last=False)
+        index = self.index(request.page)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class ThumbnailListView(QListView):
+    """List view that asks its model to render only the rows scrolled into view."""
+
+    def __init__(self, parent=None, overscan=4):
+        super().__init__(parent)
+        self.overscan = overscan
+        self.setUniformItemSizes(True)
+        # Pixel scrolling keeps the scroll bar value in pixels, which request_visible relies on
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setIconSize(QSize(72, 96))
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(30)
+        self._refresh_timer.timeout.connect(self.request_visible)
+        # valueChanged carries an int that QTimer.start would take as an interval
+        self.verticalScrollBar().valueChanged.connect(lambda _: self._refresh_timer.start())
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(self._refresh_timer.start)
+        model.rowsInserted.connect(lambda *_: self._refresh_timer.start())
+        model.rowsRemoved.connect(lambda *_: self._refresh_timer.start())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._refresh_timer.start()
+
+    def select_row(self, row):
+        model = self.model()
+        if model is None or not 0 <= row < model.rowCount():
+            return
+        index = model.index(row)
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def request_visible(self):
+        model = self.model()
+        if model is None or model.rowCount() == 0:
+            return
+        # Uniform item sizes make the visible rows a simple division of the
+        # scroll offset; items sit `spacing` apart, starting `spacing` in
+        spacing = self.spacing()
+        item_size = self.sizeHintForIndex(model.index(0, 0))
+        row_height = max(1, item_size.height() + spacing)
+        # Icon mode wraps items, so a visual row holds several model rows
+        columns = 1
+        if self.viewMode() == QListView.IconMode:
+            columns = max(1, (self.viewport().width() - spacing) // max(1, item_size.width() + spacing))
+        first_row = max(0, self.verticalScrollBar().value() - spacing) // row_height * columns
+        visible_rows = self.viewport().height() // row_height + 1
+        model.request_rows(first_row - self.overscan * columns,
+                           first_row + (visible_rows + self.overscan) * columns)
@@ -0,0 +1,184 @@
+import time
+
+from PyQt5.QtWidgets import QLabel, QListWidget
+from PyQt5.QtCore import QObject, QTimer
+
+from features.document_pool import document_pool
+from ui.pixmap_cache import pixmap_bytes
+from ui.startup_report import load_object
+
+DEFAULT_IDLE_SECONDS = 600
+DEFAULT_MEMORY_LIMIT_MB = 512
+REAP_INTERVAL_MS = 30000
+
+
+def widget_memory(widget):
+    """Rough bytes a tool holds: its own memory_usage() if it has one, else the images it shows."""
+    report = getattr(widget, "memory_usage", None)
+    if callable(report):
+        return report()
+    total = 0
+    for label in widget.findChildren(QLabel):
+        pixmap = label.pixmap()
+        if pixmap is not None and not pixmap.isNull():
+            total += pixmap_bytes(pixmap)
+    for view in widget.findChildren(QListWidget):
+        for i in range(view.count()):
+            icon = view.item(i).icon()
+            if icon.isNull():
+                continue
+            sizes = icon.availableSizes() or [view.iconSize()]
+            total += max(size.width() * size.height() for size in sizes) * 4
+    return total
+
+
+class ToolSpec:
+    """Declarative sidebar entry; `target` is a lazy "module:attribute" reference.
+
+    Widget tools name a QWidget class shown in the stack; actions name a
+    function run on click.
+    """
+
+    def __init__(self, name, label, icon, target, action=False):
+        self.name = name
+        self.label = label
+        self.icon = icon
+        self.target = target
+        self.action = action
+
+
+class _Tool:
+    def __init__(self, factory):
+        self.factory = factory
+        self.widget = None
+        self.last_active = time.monotonic()
+
+
+class ToolRegistry(QObject):
+    """Tool widgets of a QStackedWidget: one live instance per tool, torn down when idle.
+
+    Tools are registered with a factory and built on first show(); showing a
+    tool again reuses its instance. Periodically, tools that are not on
+    screen and have been idle for `idle_seconds` are torn down, and while the
+    live tools hold more than `memory_limit_mb` the largest idle ones go
+    first. A tool can release what it holds (documents, temp dirs) in a
+    close_tool() method, report its footprint from memory_usage(), and
+    keep itself alive while background work runs by returning True from
+    is_busy(), or while it holds work the user would lose by returning True
+    from has_unsaved(). A tool with a suspend() method is never torn down;
+    it is asked to shed its caches instead.
+    """
+
+    def __init__(self, stack, idle_seconds=DEFAULT_IDLE_SECONDS, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+                 parent=None):
+        super().__init__(parent)
+        self.stack = stack
+        self.idle_seconds = idle_seconds
+        self.memory_limit_bytes = int(memory_limit_mb * 1024 * 1024)
+        self.tools = {}
+        self._current = None
+        self.stack.currentChanged.connect(self.on_current_changed)
+        self.reap_timer = QTimer(self)
+        self.reap_timer.setInterval(REAP_INTERVAL_MS)
+        self.reap_timer.timeout.connect(self.reap)
+        self.reap_timer.start()
+
+    def register(self, name, factory):
+        if name not in self.tools:
+            self.tools[name] = _Tool(factory)
+
+    def register_lazy(self, name, target):
+        """Register a tool whose module is only imported the first time it is shown."""
+        self.register(name, lambda: load_object(target)())
+
+    def is_registered(self, name):
+        return name in self.tools
+
+    def widget(self, name):
+        tool = self.tools.get(name)
+        return tool.widget if tool else None
+
+    def show(self, name):
+        tool = self.tools[name]
+        if tool.widget is None:
+            tool.widget = tool.factory()
+            self.stack.addWidget(tool.widget)
+        self.stack.setCurrentWidget(tool.widget)
+        tool.last_active = time.monotonic()
+        return tool.widget
+
+    def teardown(self, name):
+        tool = self.tools[name]
+        widget = tool.widget
+        if widget is None:
+            return
+        close_tool = getattr(widget, "close_tool", None)
+        if callable(close_tool):
+            try:
+                close_tool()
+            except Exception as e:
+                print(f"Error closing {name}: {e}")
+        tool.widget = None
+        if self._current == name:
+            self._current = None
+        self.stack.removeWidget(widget)
+        widget.deleteLater()
+
+    def is_busy(self, name):
+        busy = getattr(self.tools[name].widget, "is_busy", None)
+        return callable(busy) and busy()
+
+    def has_unsaved(self, name):
+        unsaved = getattr(self.tools[name].widget, "has_unsaved", None)
+        return callable(unsaved) and unsaved()
+
+    def release(self, name):
+        """Free what an idle tool holds: suspend it if it can be, else tear it down."""
+        suspend = getattr(self.tools[name].widget, "suspend", None)
+        if callable(suspend):
+            suspend()
+        else:
+            self.teardown(name)
+
+    def on_current_changed(self, index):
+        # A tool starts idling the moment it leaves the screen
+        now = time.monotonic()
+        if self._current in self.tools:
+            self.tools[self._current].last_active = now
+        current = self.stack.widget(index)
+        self._current = next((name for name, tool in self.tools.items() if tool.widget is current), None)
+
+    def memory_report(self):
+        """Approximate bytes held by each live tool."""
+        return {name: widget_memory(tool.widget) for name, tool in self.tools.items() if tool.widget is not None}
+
+    def format_memory_report(self):
+        report = self.memory_report()
+        lines = [f"{name:<24} {size / (1024 * 1024):8.1f} MB" for name, size in
+                 sorted(report.items(), key=lambda item: -item[1])]
+        lines.append(f"{'total':<24} {sum(report.values()) / (1024 * 1024):8.1f} MB")
+        return "\n".join(lines)
+
+    def reap(self):
+        # Pooled documents are otherwise only trimmed when their thread opens or
+        # releases another one, which for an idle render or worker thread can be never
+        document_pool().sweep_all()
+        now = time.monotonic()
+        current = self.stack.currentWidget()
+        idle = [name for name, tool in self.tools.items()
+                if tool.widget is not None and tool.widget is not current
+                and not self.is_busy(name) and not self.has_unsaved(name)]
+        for name in list(idle):
+            if now - self.tools[name].last_active > self.idle_seconds:
+                self.release(name)
+                if self.tools[name].widget is None:
+                    idle.remove(name)
+
+        report = self.memory_report()
+        total = sum(report.values())
+        for name in sorted(idle, key=lambda name: -report.get(name, 0)):
+            if total <= self.memory_limit_bytes:
+                break
+            self.release(name)
+            widget = self.tools[name].widget
+            total -= report[name] - (widget_memory(widget) if widget is not None else 0)
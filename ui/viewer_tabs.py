@@ -0,0 +1,103 @@
+import os
+
+from PyQt5.QtWidgets import QTabWidget, QPushButton, QFileDialog
+
+from ui.pixmap_cache import shared_pixmap_cache, DEFAULT_BUDGET_MB
+from ui.virtualized_pdf_viewer import VirtualizedPDFViewer
+
+
+class ViewerTabs(QTabWidget):
+    """One VirtualizedPDFViewer per open document, all drawing from one render budget.
+
+    Only the current tab keeps rendered pages. Switching tabs (or leaving the
+    viewer for another tool) suspends the hidden viewers, which drop their
+    pages from the shared cache and keep just their thumbnails, so memory is
+    bounded by the budget rather than by how many files are open.
+    """
+
+    def __init__(self, parent=None, budget_mb=DEFAULT_BUDGET_MB):
+        super().__init__(parent)
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.setDocumentMode(True)
+        self.cache = shared_pixmap_cache()
+        self.cache.set_budget(budget_mb)
+
+        open_btn = QPushButton("📂")
+        open_btn.setToolTip("Open PDF in a new tab")
+        open_btn.clicked.connect(self.open_pdf)
+        self.setCornerWidget(open_btn)
+
+        self.currentChanged.connect(self.on_current_changed)
+        self.tabCloseRequested.connect(self.close_tab)
+
+    def viewers(self):
+        return [self.widget(i) for i in range(self.count())]
+
+    def open_pdf(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open PDF", "", "PDF Files (*.pdf)")
+        if file_path:
+            self.open_document(file_path)
+
+    def open_document(self, pdf_path=None, defer_extras=False):
+        """Show pdf_path, switching to its tab if it is already open."""
+        if pdf_path:
+            path = os.path.abspath(pdf_path)
+            for i, viewer in enumerate(self.viewers()):
+                if viewer.doc_path and os.path.abspath(viewer.doc_path) == path:
+                    self.setCurrentIndex(i)
+                    return viewer
+        viewer = VirtualizedPDFViewer(cache=self.cache)
+        viewer.document_opened.connect(lambda path, viewer=viewer: self.update_title(viewer))
+        index = self.addTab(viewer, "New tab")
+        if pdf_path:
+            viewer.open_pdf_from_path(pdf_path, defer_extras=defer_extras)
+        self.setCurrentIndex(index)
+        return viewer
+
+    def update_title(self, viewer):
+        index = self.indexOf(viewer)
+        if index < 0:
+            return
+        self.setTabText(index, os.path.basename(viewer.doc_path))
+        self.setTabToolTip(index, viewer.doc_path)
+
+    def suspend(self):
+        """Shed every tab's rendered pages; the tool registry calls this instead of closing the tabs."""
+        for viewer in self.viewers():
+            viewer.suspend()
+
+    def close_tool(self):
+        """Close every tab; called by the tool registry before teardown."""
+        while self.count():
+            self.close_tab(0)
+
+    def memory_usage(self):
+        # Only the current tab keeps pages in the shared cache
+        return self.cache.used_bytes + sum(viewer.thumb_model.memory_usage() for viewer in self.viewers())
+
+    def close_tab(self, index):
+        viewer = self.widget(index)
+        viewer.close_document()
+        self.removeTab(index)
+        viewer.deleteLater()
+
+    def on_current_changed(self, index):
+        current = self.widget(index)
+        for viewer in self.viewers():
+            if viewer is not current:
+                viewer.suspend()
+        if current is not None and self.isVisible():
+            current.resume()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not event.spontaneous() and self.currentWidget() is not None:
+            self.currentWidget().resume()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        # Another tool took the stack; minimizing the window is spontaneous and keeps pages
+        if not event.spontaneous():
+            for viewer in self.viewers():
+                viewer.suspend()
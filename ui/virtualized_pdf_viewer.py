@@ -1,10 +1,19 @@
-import fitz
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSlider,
-    QLineEdit, QScrollArea, QSizePolicy, QListWidget, QListWidgetItem, QApplication, QSpacerItem, QFileDialog
+    QLineEdit, QSizePolicy, QApplication, QFileDialog
 )
-from PyQt5.QtGui import QPixmap, QImage, QIcon, QPainter, QColor, QBrush
-from PyQt5.QtCore import Qt, QTimer, QEvent
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal
+
+from ui.render_engine import PageRenderEngine, TILE_SIZE, draft_scale
+from ui.pixmap_cache import shared_pixmap_cache, document_identity
+from ui.page_geometry import PageGeometry
+from ui.page_canvas import PageCanvas
+from ui.thumbnail_list import PageThumbnailModel, ThumbnailListView
+from ui.prefetch import ScrollPrefetcher
+from ui.search_worker import IndexBuildWorker, SearchWorker
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
 
 
 class PDFPageWidget(QLabel):
@@ -38,28 +47,45 @@ class PageInputLineEdit(QLineEdit):
 # from PyQt5.QtGui import QPixmap, QImage, QIcon
 # from PyQt5.QtCore import Qt, QTimer
 
-class PDFPageLabel(QLabel):
-    def __init__(self):
-        super().__init__()
-        self.setAlignment(Qt.AlignCenter)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+# Thumbnails a hidden viewer keeps; everything else it rendered is dropped
+SUSPENDED_THUMBNAILS = 200
+
 
 class VirtualizedPDFViewer(QWidget):
-    def __init__(self):
+    document_opened = pyqtSignal(str)
+    # The first sharp page after a document opened is on screen
+    first_page_shown = pyqtSignal()
+
+    def __init__(self, cache=None):
         super().__init__()
         self.setMinimumSize(1000, 800)
+        self.suspended = False
+        self.awaiting_first_page = False
+        self.extras_deferred = False
         self.doc = None
+        self.doc_handle = None
+        self.doc_path = None
+        self.doc_id = None
+        self.geometry = None
+        self.base_scale = 1.0
         self.page_height = 1200
+        self.page_spacing = 24
+        self.page_margin = 12
         self.zoom = 1.0
         self.visible_window = 2
+        # Pages bigger than this (in rendered pixels) are rendered as tiles
+        self.tile_threshold = 2048 * 2048
 
         # --- LAYOUT: Thumbnails | Viewer ---
         main_layout = QHBoxLayout(self)
 
         # ---- Thumbnail sidebar ----
-        self.thumb_list = QListWidget()
+        # Thumbnails are rendered lazily for the rows scrolled into view
+        self.thumb_model = PageThumbnailModel(self)
+        self.thumb_list = ThumbnailListView()
+        self.thumb_list.setModel(self.thumb_model)
         self.thumb_list.setFixedWidth(100)
-        self.thumb_list.itemClicked.connect(self.goto_page_from_thumb)
+        self.thumb_list.clicked.connect(self.goto_page_from_thumb)
         main_layout.addWidget(self.thumb_list)
 
         # ---- PDF controls + scroll viewer ----
@@ -90,66 +116,147 @@ class VirtualizedPDFViewer(QWidget):
         controls.addWidget(self.page_count_label)
         self.current_page_label = QLabel("Page: 1")
         controls.addWidget(self.current_page_label)
+
+        # Full-text search over a background-built index; hits stream in
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search…")
+        self.search_input.setFixedWidth(180)
+        self.search_input.returnPressed.connect(self.start_search)
+        controls.addWidget(self.search_input)
+        self.search_prev_btn = QPushButton("▲")
+        self.search_prev_btn.clicked.connect(lambda: self.goto_search_hit(-1))
+        controls.addWidget(self.search_prev_btn)
+        self.search_next_btn = QPushButton("▼")
+        self.search_next_btn.clicked.connect(lambda: self.goto_search_hit(1))
+        controls.addWidget(self.search_next_btn)
+        self.search_label = QLabel("")
+        controls.addWidget(self.search_label)
         controls.addStretch()
         viewer_panel.addLayout(controls)
 
-        # Scroll area for infinite scroll pages
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        viewer_panel.addWidget(self.scroll_area)
+        # One canvas paints the pages in view; scrolling moves an offset and
+        # only pages in the render window hold pixmaps
+        self.canvas = PageCanvas(margin=self.page_margin)
+        self.canvas.resized.connect(self.on_canvas_resized)
+        viewer_panel.addWidget(self.canvas)
         main_layout.addLayout(viewer_panel, 1)
 
-        self.container = QWidget()
-        self.page_layout = QVBoxLayout()
-        self.page_layout.setSpacing(24)
-        self.container.setLayout(self.page_layout)
-        self.scroll_area.setWidget(self.container)
-
-        self.page_widgets = []
-        self.top_spacer = None
-        self.bottom_spacer = None
+        self.render_requests = {}
         self.current_page = 0
-        self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.canvas.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.canvas.horizontalScrollBar().valueChanged.connect(self.update_tiles)
+        self.canvas.viewport().installEventFilter(self)
+
+        # Zoom gestures rescale what is on screen right away and render once
+        # the input settles
+        self.zoom_pending = False
+        self.zoom_anchor = None
+        self.zoom_timer = QTimer(self)
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(180)
+        self.zoom_timer.timeout.connect(self.commit_zoom)
+
+        # What to render around the viewport follows scroll direction and speed;
+        # once scrolling settles, pages left as drafts during a fling get sharpened
+        self.prefetcher = ScrollPrefetcher(window=self.visible_window)
+        self.draft_only = False
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(150)
+        self.settle_timer.timeout.connect(self.on_scroll_settled)
+
+        self.search_index = None
+        self.index_worker = None
+        self.search_worker = None
+        self.pending_query = None
+        self.search_hits = {}
+        self.search_order = []
+        self.current_hit = -1
+
+        # Pages are rasterized off the GUI thread and delivered back as QImages.
+        # Rendered pages go to a cache shared by every open viewer, so all
+        # documents draw from one memory budget
+        self.engine = PageRenderEngine(self)
+        self.engine.page_ready.connect(self.on_page_rendered)
+        self.cache = cache or shared_pixmap_cache()
 
     # ----- File open and thumbnail logic -----
     def open_pdf(self):
-        from PyQt5.QtWidgets import QFileDialog
         file_path, _ = QFileDialog.getOpenFileName(self, "Open PDF", "", "PDF Files (*.pdf)")
         if not file_path:
             return
-        self.doc = fitz.open(file_path)
-        self.page_count_label.setText(f"/ {len(self.doc)}")
-        self.zoom_slider.setValue(10)
-        self.zoom = 1.0
-        self.render_thumbnails()
-        self.goto_page(0)
-        self.update_current_page()
+        self.open_pdf_from_path(file_path)
 
     def render_thumbnails(self):
-        self.thumb_list.clear()
         if not self.doc:
+            self.thumb_model.set_document(None, 0)
             return
-        for i in range(len(self.doc)):
-            page = self.doc.load_page(i)
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.10, 0.10))
-            fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
-            qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
-            thumb = QPixmap.fromImage(qimg)
-            item = QListWidgetItem()
-            item.setIcon(QIcon(thumb))
-            item.setText(str(i + 1))
-            self.thumb_list.addItem(item)
-
-    def goto_page_from_thumb(self, item):
-        page_num = int(item.text()) - 1
-        self.goto_page(page_num)
+        self.thumb_model.set_document(self.doc_path, len(self.doc), self.geometry.page_sizes[0])
+
+    def goto_page_from_thumb(self, index):
+        self.goto_page(index.row())
 
     # ----- Controls -----
     def change_zoom(self, value):
-        old_page = self.current_page
         self.zoom = value / 10.0
         self.zoom_label.setText(f"{int(self.zoom*100)}%")
-        self.goto_page(old_page)
+        if not self.geometry:
+            return
+        viewport = self.canvas.viewport()
+        anchor = self.zoom_anchor or viewport.rect().center()
+        self.zoom_anchor = None
+        page_num, fx, fy = self.point_at(anchor)
+
+        # Renders queued at the previous zoom are useless now
+        self.engine.new_generation()
+        self.render_requests.clear()
+        self.zoom_pending = True
+        self.prefetcher.reset()
+        self.geometry.set_scale(self.base_scale * self.zoom)
+        for item in self.canvas.items.values():
+            item.rescale()
+        self.canvas.relayout()
+
+        # Put the same document point back under the anchor
+        x = self.canvas.page_x(page_num) + fx * self.geometry.page_width(page_num)
+        y = self.geometry.page_top(page_num) + fy * self.geometry.page_height(page_num)
+        self.canvas.scroll_to(x - anchor.x(), y - anchor.y())
+        self.current_page = self.get_current_page()
+        self.render_page_window(self.current_page)
+        self.update_current_page()
+        self.zoom_timer.start()
+
+    def commit_zoom(self):
+        """Render at the settled zoom; everything queued for earlier zooms is dropped."""
+        self.zoom_pending = False
+        if not self.doc:
+            return
+        self.engine.new_generation()
+        self.render_requests.clear()
+        for item in self.canvas.items.values():
+            self.show_page(item)
+        self.update_tiles()
+
+    def point_at(self, pos):
+        """(page, x fraction, y fraction) of the document point under a viewport position."""
+        view = self.canvas.view_rect()
+        x = view.x() + pos.x()
+        y = view.y() + pos.y()
+        page_num = self.geometry.page_at(y)
+        fx = (x - self.canvas.page_x(page_num)) / max(1, self.geometry.page_width(page_num))
+        fy = (y - self.geometry.page_top(page_num)) / max(1, self.geometry.page_height(page_num))
+        return page_num, fx, fy
+
+    def eventFilter(self, obj, event):
+        # Ctrl+wheel zooms around the point under the cursor
+        if (obj is self.canvas.viewport() and event.type() == QEvent.Wheel
+                and event.modifiers() & Qt.ControlModifier):
+            step = 1 if event.angleDelta().y() > 0 else -1
+            self.zoom_anchor = event.pos()
+            self.zoom_slider.setValue(self.zoom_slider.value() + step)
+            self.zoom_anchor = None
+            return True
+        return super().eventFilter(obj, event)
 
     def goto_page_input(self):
         try:
@@ -163,80 +270,288 @@ class VirtualizedPDFViewer(QWidget):
             return
         total_pages = len(self.doc)
         page_num = max(0, min(page_num, total_pages - 1))
-        scroll_y = int(page_num * self.page_height * self.zoom)
-        self.render_page_window(page_num)
-        QTimer.singleShot(0, lambda: self.scroll_area.verticalScrollBar().setValue(scroll_y))
+        # A jump is not scrolling; don't let it read as a fling
+        self.prefetcher.reset()
         self.current_page = page_num
+        self.render_page_window(page_num)
+        self.canvas.scroll_to(y=self.geometry.page_top(page_num))
         self.update_current_page()
 
     def get_current_page(self):
         if not self.doc:
             return 0
-        scroll = self.scroll_area.verticalScrollBar().value()
-        page = int(round(scroll / (self.page_height * self.zoom)))
-        page = max(0, min(page, len(self.doc) - 1))
-        return page
+        scroll = self.canvas.verticalScrollBar().value()
+        return self.geometry.page_at(scroll)
 
     def on_scroll(self):
         if not self.doc:
             return
+        self.prefetcher.record_scroll(self.canvas.verticalScrollBar().value())
+        self.settle_timer.start()
         page = self.get_current_page()
-        if page != self.current_page:
+        if page != self.current_page or self.prefetcher.is_fling() != self.draft_only:
             self.current_page = page
             self.render_page_window(page)
-            self.thumb_list.setCurrentRow(page)
+            self.thumb_list.select_row(page)
+        else:
+            self.update_tiles()
         self.update_current_page()
 
+    def on_scroll_settled(self):
+        if not self.doc:
+            return
+        self.prefetcher.reset()
+        self.render_page_window(self.current_page)
+
+    def on_canvas_resized(self):
+        if not self.doc or self.suspended:
+            return
+        self.render_page_window(self.get_current_page())
+
     def render_page_window(self, center_page):
-        while self.page_layout.count():
-            item = self.page_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-            else:
-                del item
-
-        self.page_widgets = []
-        total_pages = len(self.doc)
-        window = self.visible_window
-        start = max(0, center_page - window)
-        end = min(total_pages, center_page + window + 1)
-        pages_above = start
-        pages_below = total_pages - end
-
-        if pages_above > 0:
-            self.top_spacer = QSpacerItem(
-                20,
-                int(pages_above * self.page_height * self.zoom),
-                QSizePolicy.Minimum,
-                QSizePolicy.Fixed
-            )
-            self.page_layout.addSpacerItem(self.top_spacer)
-
-        for i in range(start, end):
-            label = PDFPageLabel()
-            page = self.doc.load_page(i)
-            target_height = int(self.page_height * self.zoom)
-            scale = target_height / page.rect.height
-            mat = fitz.Matrix(scale, scale)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
-            qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
-            pixmap = QPixmap.fromImage(qimg)
-            label.setPixmap(pixmap)
-            self.page_layout.addWidget(label)
-            self.page_widgets.append(label)
-
-        if pages_below > 0:
-            self.bottom_spacer = QSpacerItem(
-                20,
-                int(pages_below * self.page_height * self.zoom),
-                QSizePolicy.Minimum,
-                QSizePolicy.Fixed
-            )
-            self.page_layout.addSpacerItem(self.bottom_spacer)
-
-        self.page_layout.addStretch()
+        geometry = self.geometry
+        scroll = self.canvas.verticalScrollBar().value()
+        # goto_page renders before the scroll position catches up
+        top = scroll if geometry.page_at(scroll) == center_page else geometry.page_top(center_page)
+        pages, self.draft_only = self.prefetcher.plan(geometry, top, self.canvas.viewport().height())
+        wanted = set(pages)
+
+        # Drop queued renders for pages that left the window
+        for key, request in list(self.render_requests.items()):
+            if request.page not in wanted:
+                self.engine.cancel(request)
+                del self.render_requests[key]
+
+        # Pages still in the window keep their pixmaps untouched
+        for page in [page for page in self.canvas.items if page not in wanted]:
+            self.canvas.release(page)
+
+        # Pages come most urgent first; later ones queue at lower priority
+        for rank, i in enumerate(pages):
+            item = self.canvas.item(i)
+            if item is None:
+                item = self.canvas.bind(i)
+                self.update_highlights(item)
+            if not item.sharp:
+                self.show_page(item, priority=-min(rank, 9))
+
+        self.update_tiles()
+
+    def is_tiled(self, page_num):
+        geometry = self.geometry
+        return geometry.page_width(page_num) * geometry.page_height(page_num) > self.tile_threshold
+
+    def show_page(self, item, priority=0):
+        page_num = item.page
+        scale = self.geometry.scale
+        pixmap = None if self.is_tiled(page_num) else self.cache.get(self.doc_id, page_num, scale)
+        if pixmap is not None:
+            item.set_page_pixmap(pixmap)
+            self.page_shown()
+            return
+        if self.zoom_pending:
+            # Mid-gesture: make do with whatever is cached, render once zoom settles
+            nearby, _ = self.cache.nearest(self.doc_id, page_num, scale, max_ratio=8.0)
+            if nearby is not None:
+                item.set_backdrop(nearby)
+            return
+        # Show a scaled neighbour render until the exact one (or its tiles)
+        # arrives; with nothing cached, a quick low-res draft goes first
+        nearby, _ = self.cache.nearest(self.doc_id, page_num, scale)
+        if nearby is None:
+            nearby = self.cache.get(self.doc_id, page_num, draft_scale(scale))
+        if nearby is not None:
+            item.set_backdrop(nearby)
+        elif (page_num, "draft") not in self.render_requests:
+            self.render_requests[(page_num, "draft")] = self.engine.request_draft(self.doc_path, page_num, scale)
+        if self.draft_only:
+            # Flinging past: the full render would land after the page is gone
+            return
+        if not self.is_tiled(page_num) and page_num not in self.render_requests:
+            self.render_requests[page_num] = self.engine.request(self.doc_path, page_num, scale, priority)
+
+    def update_tiles(self):
+        """Bind cached tiles and request missing ones for the part of each tiled page in view."""
+        if not self.doc or self.zoom_pending:
+            return
+        scale = self.geometry.scale
+        view = self.canvas.view_rect().adjusted(-TILE_SIZE // 2, -TILE_SIZE // 2, TILE_SIZE // 2, TILE_SIZE // 2)
+        wanted = set()
+        for page_num, item in self.canvas.items.items():
+            if not self.is_tiled(page_num):
+                continue
+            page_rect = self.canvas.page_rect(page_num)
+            visible = view.intersected(page_rect)
+            if visible.isEmpty():
+                continue
+            visible.translate(-page_rect.x(), -page_rect.y())
+            for row in range(visible.top() // TILE_SIZE, visible.bottom() // TILE_SIZE + 1):
+                for col in range(visible.left() // TILE_SIZE, visible.right() // TILE_SIZE + 1):
+                    tile = (col, row)
+                    wanted.add((page_num, col, row))
+                    if tile in item.tiles:
+                        continue
+                    pixmap = self.cache.get(self.doc_id, page_num, scale, tile)
+                    if pixmap is not None:
+                        item.set_tile(tile, pixmap)
+                    elif (page_num, col, row) not in self.render_requests:
+                        self.render_requests[(page_num, col, row)] = self.engine.request(
+                            self.doc_path, page_num, scale, tile=tile
+                        )
+        # Panning away cancels tiles that have not started yet
+        for key, request in list(self.render_requests.items()):
+            if request.tile is not None and key not in wanted:
+                self.engine.cancel(request)
+                del self.render_requests[key]
+
+    # ----- Search -----
+    def start_index_build(self):
+        self.stop_search_workers()
+        self.search_index = None
+        self.index_worker = IndexBuildWorker(self.doc_path, len(self.doc))
+        self.index_worker.loaded.connect(self.on_index_loaded)
+        self.index_worker.progress.connect(self.on_index_progress)
+        self.index_worker.completed.connect(self.on_index_completed)
+        self.index_worker.start()
+
+    def stop_search_workers(self):
+        for worker in (self.index_worker, self.search_worker):
+            if worker is not None and worker.isRunning():
+                worker.stop()
+                worker.wait()
+        self.index_worker = None
+        self.search_worker = None
+
+    def on_index_loaded(self, index):
+        if index.path != self.doc_path:
+            return
+        self.search_index = index
+        if self.pending_query:
+            query, self.pending_query = self.pending_query, None
+            self.run_search(query)
+
+    def on_index_progress(self, pages_done):
+        if not self.search_order and self.search_worker is None:
+            self.search_label.setText(f"Indexing {pages_done}/{len(self.doc)}")
+
+    def on_index_completed(self, index):
+        if self.search_label.text().startswith("Indexing"):
+            self.search_label.setText("")
+
+    def start_search(self):
+        query = self.search_input.text().strip()
+        if not self.doc or not query:
+            return
+        if self.search_index is None:
+            self.pending_query = query
+            self.search_label.setText("Indexing…")
+            return
+        self.run_search(query)
+
+    def run_search(self, query):
+        if self.search_worker is not None and self.search_worker.isRunning():
+            self.search_worker.stop()
+            self.search_worker.wait()
+        self.clear_search()
+        self.search_label.setText("Searching…")
+        self.search_worker = SearchWorker(self.doc_path, self.search_index, query)
+        self.search_worker.hits_found.connect(self.on_search_hits)
+        self.search_worker.finished_search.connect(self.on_search_finished)
+        self.search_worker.start()
+
+    def clear_search(self):
+        self.search_hits = {}
+        self.search_order = []
+        self.current_hit = -1
+        for item in self.canvas.items.values():
+            self.update_highlights(item)
+
+    def on_search_hits(self, page_num, rects):
+        if self.sender() is not self.search_worker:
+            return
+        self.search_hits[page_num] = rects
+        self.search_order.extend((page_num, i) for i in range(len(rects)))
+        self.search_label.setText(f"{len(self.search_order)} hits…")
+        if self.current_hit < 0:
+            self.goto_search_hit(1)
+        elif page_num in self.canvas.items:
+            self.update_highlights(self.canvas.items[page_num])
+
+    def on_search_finished(self, query, pages_with_hits):
+        if self.sender() is not self.search_worker:
+            return
+        count = len(self.search_order)
+        self.search_label.setText(f"{count} hit{'s' if count != 1 else ''}" if count else "No matches")
+
+    def goto_search_hit(self, step):
+        if not self.search_order:
+            return
+        previous = self.search_order[self.current_hit][0] if self.current_hit >= 0 else None
+        self.current_hit = (self.current_hit + step) % len(self.search_order)
+        page_num, i = self.search_order[self.current_hit]
+        x0, y0, x1, y1 = self.search_hits[page_num][i]
+        scale = self.geometry.scale
+        viewport = self.canvas.viewport()
+        self.canvas.scroll_to(
+            self.canvas.page_x(page_num) + x0 * scale - viewport.width() / 3,
+            self.geometry.page_top(page_num) + y0 * scale - viewport.height() / 3,
+        )
+        for page in (previous, page_num):
+            if page in self.canvas.items:
+                self.update_highlights(self.canvas.items[page])
+
+    def update_highlights(self, item):
+        rects = self.search_hits.get(item.page, ())
+        current = -1
+        if 0 <= self.current_hit < len(self.search_order):
+            hit_page, hit_index = self.search_order[self.current_hit]
+            if hit_page == item.page:
+                current = hit_index
+        item.set_highlights(rects, current)
+
+    def on_page_rendered(self, request, image):
+        if request.draft:
+            key = (request.page, "draft")
+        elif request.tile is None:
+            key = request.page
+        else:
+            key = (request.page,) + request.tile
+        if self.render_requests.get(key) is request:
+            del self.render_requests[key]
+        if request.path != self.doc_path:
+            return
+        if not request.draft and request.tile is None and request.render_seconds is not None:
+            self.prefetcher.record_render(request.render_seconds)
+        pixmap = QPixmap.fromImage(image)
+        self.cache.put(self.doc_id, request.page, request.scale, pixmap, request.tile)
+        item = self.canvas.item(request.page)
+        if item is None:
+            return
+        if request.draft:
+            if not item.sharp:
+                item.set_backdrop(pixmap)
+        elif request.tile is None:
+            item.set_page_pixmap(pixmap)
+            self.page_shown()
+        else:
+            item.set_tile(request.tile, pixmap)
+            self.page_shown()
+
+    def page_shown(self):
+        if not self.awaiting_first_page:
+            return
+        self.awaiting_first_page = False
+        self.first_page_shown.emit()
+        if self.extras_deferred:
+            self.extras_deferred = False
+            # Let the first page paint before thumbnails and indexing compete for the pool
+            QTimer.singleShot(0, self.start_extras)
+
+    def start_extras(self):
+        if not self.doc:
+            return
+        self.render_thumbnails()
+        self.start_index_build()
 
     def update_current_page(self):
         if not self.doc:
@@ -245,17 +560,98 @@ class VirtualizedPDFViewer(QWidget):
         self.current_page_label.setText(f"Page: {page + 1}")
         self.page_input.setText(str(page + 1))
         # Highlight thumbnail
-        self.thumb_list.setCurrentRow(page)
-        self.thumb_list.scrollToItem(self.thumb_list.currentItem(), hint=QListWidget.PositionAtCenter)
+        self.thumb_list.select_row(page)
 
-    def open_pdf_from_path(self, file_path):
-        self.doc = fitz.open(file_path)
+    # ----- Tab lifecycle -----
+    def suspend(self):
+        """Shed rendered pages while hidden; the document, thumbnails and search stay."""
+        if self.suspended:
+            return
+        self.suspended = True
+        self.zoom_timer.stop()
+        self.settle_timer.stop()
+        self.zoom_pending = False
+        self.engine.new_generation()
+        self.render_requests.clear()
+        self.canvas.clear_items()
+        if self.doc_id is not None:
+            self.cache.evict_document(self.doc_id)
+        self.thumb_model.trim(SUSPENDED_THUMBNAILS)
+
+    def resume(self):
+        if not self.suspended:
+            return
+        self.suspended = False
+        if not self.doc:
+            return
+        self.render_page_window(self.get_current_page())
+        self.thumb_list.request_visible()
+
+    def close_document(self):
+        """Release everything held for the open document."""
+        self.zoom_timer.stop()
+        self.settle_timer.stop()
+        self.engine.new_generation()
+        self.render_requests.clear()
+        self.canvas.clear_items()
+        self.stop_search_workers()
+        self.search_index = None
+        self.clear_search()
+        if self.doc_id is not None:
+            self.cache.evict_document(self.doc_id)
+        if self.doc_handle is not None:
+            self.doc_handle.release()
+        self.doc = self.doc_handle = self.doc_path = self.doc_id = None
+        self.geometry = None
+        self.canvas.set_page_geometry(None)
+        self.thumb_model.set_document(None, 0)
+
+    def open_pdf_from_path(self, file_path, defer_extras=False):
+        """Open a document; with defer_extras, thumbnails and the search index wait for the first page."""
+        self.engine.new_generation()
+        self.render_requests.clear()
+        self.canvas.clear_items()
+        self.stop_search_workers()
+        self.pending_query = None
+        self.clear_search()
+        self.search_label.setText("")
+        if self.doc_id is not None:
+            self.cache.evict_document(self.doc_id)
+        if self.doc_handle is not None:
+            self.doc_handle.release()
+        self.doc_handle = document_pool().acquire(file_path)
+        self.doc = self.doc_handle.doc
+        self.doc_path = file_path
+        self.doc_id = document_identity(file_path)
+        # All pages share one scale: the first page is page_height pixels tall
+        # at 100% and every other page keeps its real proportions
+        with FITZ_LOCK:
+            first_rect = self.doc.load_page(0).rect
+        self.base_scale = self.page_height / first_rect.height
+        self.geometry = PageGeometry.from_document(
+            self.doc,
+            scale=self.base_scale,
+            spacing=self.page_spacing,
+            margin=self.page_margin,
+        )
+        self.canvas.set_page_geometry(self.geometry)
         self.page_count_label.setText(f"/ {len(self.doc)}")
+        self.zoom_timer.stop()
+        self.zoom_pending = False
+        self.zoom_slider.blockSignals(True)
         self.zoom_slider.setValue(10)
+        self.zoom_slider.blockSignals(False)
         self.zoom = 1.0
-        self.render_thumbnails()
+        self.zoom_label.setText("100%")
+        self.awaiting_first_page = True
+        self.extras_deferred = defer_extras
+        if not defer_extras:
+            self.render_thumbnails()
         self.goto_page(0)
         self.update_current_page()
+        if not defer_extras:
+            self.start_index_build()
+        self.document_opened.emit(file_path)
 
 if __name__ == "__main__":
     import sys
@@ -268,8 +664,8 @@ if __name__ == "__main__":
         QSlider { background: #e6e8ea; }
         QLineEdit { background: #fff; border: 1px solid #aab5c6; border-radius: 4px; padding: 4px; }
         QScrollArea { background: #f7f8fa; }
-        QListWidget { background: #f3f4f6; border: 1px solid #e2e6ec; }
-        QListWidget::item:selected { background: #d0e2ff; }
+        QListView { background: #f3f4f6; border: 1px solid #e2e6ec; }
+        QListView::item:selected { background: #d0e2ff; }
     """)
     viewer.showMaximized()
     sys.exit(app.exec())
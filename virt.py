@@ -1,17 +1,29 @@
-import fitz
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSlider,
-    QScrollArea, QApplication, QFileDialog
+    QApplication, QFileDialog
 )
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QColor, QBrush
+from PyQt5.QtGui import QPixmap, QColor
 from PyQt5.QtCore import Qt, QTimer
 
+from ui.render_engine import PageRenderEngine
+from ui.page_geometry import PageGeometry
+from ui.page_canvas import PageCanvas, PageChrome
+from features.document_pool import document_pool
+from features.fitz_lock import FITZ_LOCK
+
+PAGE_MARGIN = 24
+SHADOW_OFFSET = 10
+
 class VirtualizedPDFViewer(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Adobe-Like PDF Viewer")
         self.setMinimumSize(1100, 800)
         self.doc = None
+        self.doc_handle = None
+        self.doc_path = None
+        self.geometry = None
+        self.page_points = []
         self.zoom = 1.0
         self.visible_window = 2
 
@@ -27,6 +39,11 @@ class VirtualizedPDFViewer(QWidget):
         self.zoom_slider.setRange(5, 30)
         self.zoom_slider.setValue(10)
         self.zoom_slider.valueChanged.connect(self.change_zoom)
+        # One render once the slider settles instead of one per intermediate value
+        self.zoom_timer = QTimer(self)
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(180)
+        self.zoom_timer.timeout.connect(self.apply_zoom)
         ctrl.addWidget(QLabel("Zoom:"))
         ctrl.addWidget(self.zoom_slider)
         self.zoom_label = QLabel("100%")
@@ -34,31 +51,74 @@ class VirtualizedPDFViewer(QWidget):
         ctrl.addStretch()
         main_layout.addLayout(ctrl)
 
-        # Scroll Area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        main_layout.addWidget(self.scroll_area)
-
-        self.container = QWidget()
-        self.page_layout = QVBoxLayout(self.container)
-        self.scroll_area.setWidget(self.container)
-
-        self.page_widgets = []
+        # Pages are painted on one canvas: shadow and paper first, then the render
+        chrome = PageChrome(
+            shadow_offset=SHADOW_OFFSET, radius=8, shadow_color=QColor(0, 0, 0, 40),
+            paper_color=QColor("#fff"), border_color=None,
+        )
+        self.canvas = PageCanvas(margin=PAGE_MARGIN, chrome=chrome, background=QColor("#f7f7fa"))
+        # Pages fit the width, so resizing refits them once it settles
+        self.canvas.resized.connect(self.zoom_timer.start)
+        main_layout.addWidget(self.canvas)
+
+        self.render_requests = {}
         self.current_page = 0
-        self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.canvas.verticalScrollBar().valueChanged.connect(self.on_scroll)
+
+        # Each page renders twice off the GUI thread: a quick draft, then full quality
+        self.engine = PageRenderEngine(self)
+        self.engine.page_ready.connect(self.on_page_rendered)
 
     def open_pdf(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open PDF", "", "PDF Files (*.pdf)")
         if not file_path:
             return
-        self.doc = fitz.open(file_path)
+        self.engine.new_generation()
+        self.render_requests.clear()
+        self.canvas.clear_items()
+        if self.doc_handle is not None:
+            self.doc_handle.release()
+        self.doc_handle = document_pool().acquire(file_path)
+        self.doc = self.doc_handle.doc
+        self.doc_path = file_path
         self.zoom_slider.setValue(10)
         self.zoom = 1.0
+        self.zoom_timer.stop()
+        # Every page is shown fit-to-width, so sizes are kept relative to the page width
+        self.page_points = []
+        sizes = []
+        with FITZ_LOCK:
+            for i in range(len(self.doc)):
+                rect = self.doc.load_page(i).rect
+                self.page_points.append(rect.width)
+                sizes.append((1.0, rect.height / rect.width))
+        self.geometry = PageGeometry(sizes, scale=self.fit_width(), spacing=2 * PAGE_MARGIN, margin=PAGE_MARGIN)
+        self.canvas.set_page_geometry(self.geometry)
         self.goto_page(0)
 
     def change_zoom(self, value):
         self.zoom = value / 10.0
         self.zoom_label.setText(f"{int(self.zoom*100)}%")
+        self.zoom_timer.start()
+
+    def fit_width(self):
+        """Width of every page on screen at the current zoom."""
+        available = self.canvas.viewport().width() - 2 * PAGE_MARGIN - SHADOW_OFFSET
+        return max(1, available) * self.zoom
+
+    def page_scale(self, page_num):
+        return self.geometry.page_width(page_num) / self.page_points[page_num]
+
+    def apply_zoom(self):
+        if not self.doc:
+            return
+        self.engine.new_generation()
+        self.render_requests.clear()
+        # Stretch what is on screen until the new renders land
+        self.geometry.set_scale(self.fit_width())
+        for item in self.canvas.items.values():
+            item.rescale()
+        self.canvas.relayout()
         self.goto_page(self.current_page)
 
     def goto_page(self, page_num):
@@ -66,35 +126,19 @@ class VirtualizedPDFViewer(QWidget):
             return
         total_pages = len(self.doc)
         page_num = max(0, min(page_num, total_pages - 1))
-        self.render_page_window(page_num)
-        # QTimer.singleShot(0, lambda: self.scroll_area.verticalScrollBar().setValue(page_num * 1200 * self.zoom))
-        QTimer.singleShot(0, lambda: self.scroll_area.verticalScrollBar().setValue(int(page_num * 1200 * self.zoom)))
-
         self.current_page = page_num
+        self.render_page_window(page_num)
+        self.canvas.scroll_to(y=self.geometry.page_top(page_num))
 
     def on_scroll(self):
-        # Simple: get the closest visible page, trigger re-render if needed
         if not self.doc:
             return
-        scrollbar = self.scroll_area.verticalScrollBar()
-        value = scrollbar.value()
-        # Assume page height ~1200px for scroll calculation
-        page = int(round(value / (1200 * self.zoom)))
-        page = max(0, min(page, len(self.doc)-1))
+        page = self.geometry.page_at(self.canvas.verticalScrollBar().value())
         if page != self.current_page:
-            self.goto_page(page)
+            self.current_page = page
+            self.render_page_window(page)
 
     def render_page_window(self, center_page):
-        # Remove all widgets
-        while self.page_layout.count():
-            item = self.page_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-            else:
-                del item
-
-        self.page_widgets = []
         if not self.doc:
             return
 
@@ -102,56 +146,42 @@ class VirtualizedPDFViewer(QWidget):
         window = self.visible_window
         start = max(0, center_page - window)
         end = min(total_pages, center_page + window + 1)
-        scroll_area_width = self.scroll_area.viewport().width() - 48
 
-        bg_color = QColor("#f7f7fa")
-        paper_color = QColor("#fff")
-        shadow_color = QColor(0, 0, 0, 40)
+        # Drop renders and bitmaps for pages that left the window
+        for page_num in list(self.render_requests):
+            if not start <= page_num < end:
+                for request in self.render_requests.pop(page_num):
+                    self.engine.cancel(request)
+        for page_num in [page for page in self.canvas.items if not start <= page < end]:
+            self.canvas.release(page_num)
 
         for i in range(start, end):
-            page = self.doc.load_page(i)
-            page_width = page.rect.width
-            fit_width_scale = scroll_area_width / page_width
-            scale = fit_width_scale * self.zoom
-
-            mat = fitz.Matrix(scale, scale)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            fmt = QImage.Format_RGBA8888 if pix.alpha else QImage.Format_RGB888
-            qimg = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
-            pixmap = QPixmap.fromImage(qimg)
-
-            # -- Canvas with border, shadow, and background
-            margin = 24
-            shadow_offset = 10
-            canvas_width = pixmap.width() + margin * 2 + shadow_offset
-            canvas_height = pixmap.height() + margin * 2 + shadow_offset
-            canvas = QPixmap(canvas_width, canvas_height)
-            canvas.fill(bg_color)
-
-            painter = QPainter(canvas)
-            painter.setRenderHint(QPainter.Antialiasing)
-            # Shadow
-            painter.setBrush(QBrush(shadow_color))
-            painter.setPen(Qt.NoPen)
-            painter.drawRoundedRect(
-                margin + shadow_offset, margin + shadow_offset,
-                pixmap.width(), pixmap.height(), 12, 12)
-            # White "paper"
-            painter.setBrush(QBrush(paper_color))
-            painter.setPen(Qt.NoPen)
-            painter.drawRoundedRect(margin, margin, pixmap.width(), pixmap.height(), 8, 8)
-            # PDF Page
-            painter.drawPixmap(margin, margin, pixmap)
-            painter.end()
-
-            label = QLabel()
-            label.setPixmap(canvas)
-            label.setFixedSize(canvas.size())
-            label.setAlignment(Qt.AlignCenter)
-            self.page_layout.addWidget(label)
-            self.page_widgets.append(label)
-
-        self.page_layout.addStretch()
+            # Blank paper until the draft arrives
+            item = self.canvas.bind(i)
+            if item.sharp:
+                continue
+            scale = self.page_scale(i)
+            draft, full = self.render_requests.get(i, (None, None))
+            if full is None or full.scale != scale or not self.engine.is_current(full):
+                self.render_requests[i] = (
+                    self.engine.request_draft(self.doc_path, i, scale),
+                    self.engine.request(self.doc_path, i, scale),
+                )
+
+    def on_page_rendered(self, request, image):
+        if request not in self.render_requests.get(request.page, ()):
+            return
+        item = self.canvas.item(request.page)
+        if item is None:
+            return
+        pixmap = QPixmap.fromImage(image)
+        if request.draft:
+            # Stretched to the page size at paint time
+            if not item.sharp:
+                item.set_backdrop(pixmap)
+        else:
+            del self.render_requests[request.page]
+            item.set_page_pixmap(pixmap)
 
 if __name__ == "__main__":
     import sys